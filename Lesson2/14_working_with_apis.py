@@ -4,6 +4,7 @@
 
 import requests
 import json
+import os
 
 # Basic GET request
 # Example with a free API
@@ -24,12 +25,21 @@ except Exception as e:
     print(f"Error: {e}")
 
 # Working with JSONPlaceholder (free fake API for testing)
-def get_posts():
-    url = "https://jsonplaceholder.typicode.com/posts"
-    response = requests.get(url)
+from itertools import islice
+
+# Pass an APIClient (e.g. one with a ResponseCache) to reuse its connection and cache
+# stream=True reads only as much of the response as the 5 posts need
+def get_posts(client=None, stream=False):
+    if client and stream:
+        posts = list(islice(client.get_stream("posts"), 5))
+    elif client:
+        posts = client.get("posts")
+    else:
+        url = "https://jsonplaceholder.typicode.com/posts"
+        response = requests.get(url)
+        posts = response.json() if response.status_code == 200 else None
     
-    if response.status_code == 200:
-        posts = response.json()
+    if posts:
         # Show first 5 posts
         for post in posts[:5]:
             print(f"\nTitle: {post['title']}")
@@ -40,7 +50,7 @@ def get_posts():
 # get_posts()
 
 # GET request with parameters
-def search_repositories(query):
+def search_repositories(query, client=None, stream=False):
     url = "https://api.github.com/search/repositories"
     params = {
         'q': query,
@@ -48,18 +58,26 @@ def search_repositories(query):
         'order': 'desc'
     }
     
-    response = requests.get(url, params=params)
+    if client and stream:
+        # total_count comes before "items", so it ends up in header
+        header = {}
+        items = list(islice(client.get_stream("search/repositories", params, header=header), 5))
+        data = {'total_count': header.get('total_count', 0), 'items': items}
+    elif client:
+        data = client.get("search/repositories", params=params)
+    else:
+        response = requests.get(url, params=params)
+        data = response.json() if response.status_code == 200 else None
+        if data is None:
+            print(f"Error: {response.status_code}")
     
-    if response.status_code == 200:
-        data = response.json()
+    if data:
         print(f"Found {data['total_count']} repositories")
         
         for repo in data['items'][:5]:
             print(f"\n{repo['name']}")
             print(f"Stars: {repo['stargazers_count']}")
             print(f"URL: {repo['html_url']}")
-    else:
-        print(f"Error: {response.status_code}")
 
 # search_repositories("python")
 
@@ -185,13 +203,17 @@ def get_random_quote():
 # get_random_quote()
 
 # Saving API response to file
+# Files ending in .snap use the compact snapshot format below
 def save_api_data(url, filename):
     try:
         response = requests.get(url)
         
         if response.status_code == 200:
-            with open(filename, 'w') as file:
-                json.dump(response.json(), file, indent=2)
+            if filename.endswith(".snap"):
+                write_snapshot(filename, response.json())
+            else:
+                with open(filename, 'w') as file:
+                    json.dump(response.json(), file, indent=2)
             print(f"Data saved to {filename}")
         else:
             print("Failed to fetch data")
@@ -199,31 +221,270 @@ def save_api_data(url, filename):
         print(f"Error: {e}")
 
 # save_api_data("https://jsonplaceholder.typicode.com/posts/1", "post_data.json")
+# save_api_data("https://jsonplaceholder.typicode.com/posts", "posts.snap")
+
+# Compact snapshot format - smaller than pretty JSON, and one record can
+# be read without parsing the whole file.
+#   header:  b"APISNAP1", is_list (1 byte), record count, index position
+#   records: length (4 bytes) + zlib-compressed JSON, one per list item
+#   index:   position of every record (8 bytes each), at the end
+import mmap
+import struct
+import zlib
+
+SNAPSHOT_MAGIC = b"APISNAP1"
+SNAPSHOT_HEADER = struct.Struct("<8s?IQ")
+
+def write_snapshot(filename, data):
+    is_list = isinstance(data, list)
+    records = data if is_list else [data]
+    
+    with open(filename, 'wb') as file:
+        file.write(b"\0" * SNAPSHOT_HEADER.size)  # Filled in at the end
+        offsets = []
+        for record in records:
+            offsets.append(file.tell())
+            blob = zlib.compress(json.dumps(record, separators=(',', ':')).encode())
+            file.write(struct.pack("<I", len(blob)))
+            file.write(blob)
+        
+        index_pos = file.tell()
+        file.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        file.seek(0)
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, is_list, len(offsets), index_pos))
+
+class SnapshotReader:
+    def __init__(self, filename):
+        with open(filename, 'rb') as file:
+            # mmap: the OS pages the file in as we touch it - no full read
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.is_list, self.count, index_pos = SNAPSHOT_HEADER.unpack_from(self.data, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.data.close()
+            raise ValueError(f"{filename} is not a snapshot file")
+        self.index_pos = index_pos
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        offset = struct.unpack_from("<Q", self.data, self.index_pos + 8 * i)[0]
+        length = struct.unpack_from("<I", self.data, offset)[0]
+        return json.loads(zlib.decompress(self.data[offset + 4:offset + 4 + length]))
+    
+    def load_all(self):
+        # Decompress every record, then parse them all with one json.loads
+        offsets = struct.unpack_from(f"<{self.count}Q", self.data, self.index_pos)
+        parts = []
+        for offset in offsets:
+            length = struct.unpack_from("<I", self.data, offset)[0]
+            parts.append(zlib.decompress(self.data[offset + 4:offset + 4 + length]))
+        records = json.loads(b"[" + b",".join(parts) + b"]")
+        return records if self.is_list else records[0]
+    
+    def close(self):
+        self.data.close()
+
+def read_snapshot_record(filename, i):
+    reader = SnapshotReader(filename)
+    try:
+        return reader[i]
+    finally:
+        reader.close()
 
 # Reading saved API data
+# Results are cached by file modification time, so loading the same
+# unchanged file again is instant. Don't modify the returned data in place.
+_loaded_files = {}  # filename -> (mtime, data)
+
 def load_api_data(filename):
     try:
-        with open(filename, 'r') as file:
-            data = json.load(file)
-            return data
+        mtime = os.stat(filename).st_mtime_ns
+        cached = _loaded_files.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        if filename.endswith(".snap"):
+            reader = SnapshotReader(filename)
+            data = reader.load_all()
+            reader.close()
+        else:
+            with open(filename, 'r') as file:
+                data = json.load(file)
+        
+        _loaded_files[filename] = (mtime, data)
+        return data
     except FileNotFoundError:
         print(f"File {filename} not found")
         return None
-    except json.JSONDecodeError:
-        print("Invalid JSON file")
+    except (json.JSONDecodeError, ValueError, zlib.error, struct.error):
+        print(f"Invalid data file: {filename}")
         return None
 
+# Benchmark: pretty JSON vs snapshot - disk size and load time
+def benchmark_snapshot(num_records=100_000, folder="."):
+    records = [{'userId': i % 10, 'id': i, 'title': f"Post number {i}",
+                'body': "Lorem ipsum dolor sit amet " * 5} for i in range(num_records)]
+    json_file = os.path.join(folder, "bench_posts.json")
+    snap_file = os.path.join(folder, "bench_posts.snap")
+    with open(json_file, 'w') as file:
+        json.dump(records, file, indent=2)
+    write_snapshot(snap_file, records)
+    
+    for filename in (json_file, snap_file):
+        _loaded_files.pop(filename, None)
+        start = time.perf_counter()
+        load_api_data(filename)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        load_api_data(filename)
+        cached = time.perf_counter() - start
+        size = os.path.getsize(filename)
+        print(f"{filename}: {size / 1e6:.1f} MB, load {cold:.3f}s, cached {cached * 1e6:.0f} µs")
+    
+    start = time.perf_counter()
+    read_snapshot_record(snap_file, num_records // 2)
+    print(f"One record from snapshot: {(time.perf_counter() - start) * 1e6:.0f} µs")
+
+# benchmark_snapshot()
+
+# Circuit breaker and adaptive timeouts
+# A fixed timeout=10 means a slow server ties up every caller for 10s.
+# LatencyTracker learns how fast each host normally answers and sets the
+# timeout from its p99. CircuitBreaker stops calling a host that keeps
+# failing ("open"), then lets one test request through after a pause
+# ("half-open") to see if it has recovered.
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+class CircuitOpenError(Exception):
+    pass
+
+class LatencyTracker:
+    def __init__(self, window=200, min_samples=20, multiplier=3, floor=0.5):
+        self.window = window
+        self.min_samples = min_samples
+        self.multiplier = multiplier  # timeout = p99 * multiplier
+        self.floor = floor            # Never go below this (seconds)
+        self.samples = {}             # host -> recent latencies
+        self.lock = threading.Lock()
+    
+    def record(self, host, seconds):
+        with self.lock:
+            self.samples.setdefault(host, deque(maxlen=self.window)).append(seconds)
+    
+    def timeout_for(self, host, default=10):
+        with self.lock:
+            samples = sorted(self.samples.get(host, ()))
+        if len(samples) < self.min_samples:
+            return default  # Not enough data yet
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return min(default, max(self.floor, p99 * self.multiplier))
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=0.5, min_requests=10, window=50, reset_timeout=30):
+        self.failure_threshold = failure_threshold  # Error rate that opens the circuit
+        self.min_requests = min_requests
+        self.window = window
+        self.reset_timeout = reset_timeout  # Seconds before trying again
+        self.hosts = {}
+        self.lock = threading.Lock()
+    
+    def _host(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = {'state': 'closed', 'results': deque(maxlen=self.window),
+                                'opened_at': 0, 'probing': False}
+        return self.hosts[host]
+    
+    def allow(self, host):
+        with self.lock:
+            h = self._host(host)
+            if h['state'] == 'closed':
+                return True
+            if h['state'] == 'open' and time.monotonic() - h['opened_at'] >= self.reset_timeout:
+                h['state'] = 'half_open'
+            if h['state'] == 'half_open' and not h['probing']:
+                h['probing'] = True  # Exactly one test request
+                return True
+            return False
+    
+    def record(self, host, success):
+        with self.lock:
+            h = self._host(host)
+            if h['state'] == 'half_open':
+                h['probing'] = False
+                if success:
+                    h['state'] = 'closed'
+                    h['results'].clear()
+                else:
+                    h['state'] = 'open'
+                    h['opened_at'] = time.monotonic()
+                return
+            
+            h['results'].append(success)
+            failures = h['results'].count(False)
+            if (len(h['results']) >= self.min_requests
+                    and failures / len(h['results']) >= self.failure_threshold):
+                h['state'] = 'open'
+                h['opened_at'] = time.monotonic()
+    
+    def state(self, host):
+        with self.lock:
+            return self._host(host)['state']
+
+def guarded_request(http, method, url, breaker, latency, default_timeout=10, **kwargs):
+    # http can be the requests module or a Session
+    host = urlparse(url).netloc
+    if breaker and not breaker.allow(host):
+        raise CircuitOpenError(f"Circuit open for {host} - failing fast")
+    
+    # The half-open probe gets the full default timeout, so a host that
+    # simply became slower can still answer it
+    probing = breaker is not None and breaker.state(host) == 'half_open'
+    if latency and not probing:
+        timeout = latency.timeout_for(host, default_timeout)
+    else:
+        timeout = default_timeout
+    start = time.perf_counter()
+    try:
+        response = http.request(method, url, timeout=timeout, **kwargs)
+    except requests.RequestException as e:
+        if latency and isinstance(e, requests.Timeout):
+            # Count a timeout as a sample at the timeout we allowed; after a
+            # slowdown the learned timeout then grows instead of staying stuck
+            latency.record(host, timeout)
+        if breaker:
+            breaker.record(host, False)
+        raise
+    
+    success = response.status_code < 500
+    if latency and success:
+        latency.record(host, time.perf_counter() - start)
+    if breaker:
+        breaker.record(host, success)
+    return response
+
+# Shared by fetch_user_data calls
+user_api_breaker = CircuitBreaker()
+user_api_latency = LatencyTracker()
+
 # Error handling best practices
-def fetch_user_data(user_id):
-    url = f"https://jsonplaceholder.typicode.com/users/{user_id}"
+def fetch_user_data(user_id, base_url="https://jsonplaceholder.typicode.com"):
+    url = f"{base_url}/users/{user_id}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = guarded_request(requests, "GET", url, user_api_breaker, user_api_latency)
         response.raise_for_status()  # Raises exception for bad status codes
         
         data = response.json()
         return data
         
+    except CircuitOpenError as e:
+        print(e)
     except requests.ConnectionError:
         print("Connection error. Check your internet.")
     except requests.Timeout:
@@ -259,33 +520,1001 @@ def fetch_multiple_users(user_ids):
 # for user in users:
 #     print(user['name'])
 
+# Async version - many requests in flight at once, but never faster than
+# the allowed rate. A token bucket replaces the fixed sleep: it refills
+# `rate` tokens per second and each request takes one token.
+# Note: Requires aiohttp library: pip install aiohttp
+import asyncio
+import queue
+import aiohttp
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1):
+        self.rate = rate            # Tokens added per second
+        self.capacity = capacity    # Max burst size
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+                # Count from when the token was due, so oversleeping isn't lost
+                self.updated = now + wait
+                self.tokens = 1
+            self.tokens -= 1
+
+async def fetch_user_async(session, bucket, url, timeout=10, retries=3):
+    for attempt in range(retries + 1):
+        await bucket.acquire()
+        try:
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status == 200:
+                    return await response.json()
+                if response.status != 429 and response.status < 500:
+                    return None  # e.g. 404 - retrying won't help
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Attempt {attempt + 1} failed for {url}: {e}")
+        
+        if attempt < retries:
+            await asyncio.sleep(0.5 * 2 ** attempt)  # Back off: 0.5s, 1s, 2s...
+    return None
+
+async def fetch_multiple_users_async(user_ids, base_url="https://jsonplaceholder.typicode.com",
+                                     concurrency=10, rate=2, timeout=10, retries=3):
+    bucket = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)  # Max requests in flight
+    
+    async with aiohttp.ClientSession() as session:
+        async def fetch_one(user_id):
+            async with semaphore:
+                return await fetch_user_async(session, bucket, f"{base_url}/users/{user_id}",
+                                              timeout, retries)
+        
+        # gather keeps results in the same order as user_ids;
+        # a user that couldn't be fetched is None in its place
+        return await asyncio.gather(*(fetch_one(user_id) for user_id in user_ids))
+
+# users = asyncio.run(fetch_multiple_users_async([1, 2, 3, 4, 5]))
+# failed = [user_id for user_id, user in zip([1, 2, 3, 4, 5], users) if user is None]
+
+# Benchmark: does the async version reach the rate limit?
+def benchmark_fetch_users(num_users=1000, rate=200, concurrency=20):
+    server, base_url = start_local_server()
+    start = time.perf_counter()
+    users = asyncio.run(fetch_multiple_users_async(range(num_users), base_url,
+                                                   concurrency=concurrency, rate=rate))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    fetched = sum(user is not None for user in users)
+    print(f"Fetched {fetched} users in {elapsed:.2f}s "
+          f"({fetched / elapsed:.0f}/s, limit {rate}/s)")
+
+# benchmark_fetch_users()
+
+# Response cache - keeps recent GET results so repeat calls don't
+# download the same data again. Follows the server's Cache-Control
+# max-age, and after that asks "has it changed?" with ETag /
+# Last-Modified - the server answers 304 Not Modified (no body) if not.
+import hashlib
+from collections import OrderedDict
+
+class ResponseCache:
+    def __init__(self, max_entries=256, directory=None, ttl_overrides=None):
+        self.max_entries = max_entries
+        self.directory = directory  # Optional folder for an on-disk copy
+        self.ttl_overrides = ttl_overrides or {}  # endpoint prefix -> seconds
+        self.entries = OrderedDict()
+        self.hits = 0          # Served from cache without a request
+        self.revalidated = 0   # Server said 304 Not Modified
+        self.misses = 0        # Full download
+        self.lock = threading.Lock()  # Shared by threads using the same client
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+    
+    def lookup(self, key):
+        # Returns a copy, so other threads can't change it under the caller
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return dict(entry)
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None  # Not on disk (or a half-written file)
+        with self.lock:
+            self._remember(key, entry)
+        return dict(entry)
+    
+    def _remember(self, key, entry):
+        # Caller holds self.lock
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)  # Drop least recently used
+    
+    def ttl_for(self, endpoint, headers):
+        # Caller overrides win (longest matching prefix)
+        matches = [prefix for prefix in self.ttl_overrides if endpoint.startswith(prefix)]
+        if matches:
+            return self.ttl_overrides[max(matches, key=len)]
+        
+        cache_control = headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control:
+            return None  # Must not be cached at all
+        if 'no-cache' in cache_control:
+            return 0     # Cache, but always revalidate
+        for part in cache_control.split(','):
+            name, _, value = part.strip().partition('=')
+            if name == 'max-age' and value.isdigit():
+                return int(value)
+        return 0
+    
+    def store(self, key, endpoint, response, data):
+        ttl = self.ttl_for(endpoint, response.headers)
+        if ttl is None:
+            return
+        entry = {
+            'data': data,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'ttl': ttl,
+            'expires': time.time() + ttl,
+        }
+        with self.lock:
+            self._remember(key, entry)
+        self.save_to_disk(key, entry)
+    
+    def revalidate(self, key, entry):
+        # Server said 304 Not Modified: our copy is good for another ttl
+        entry = dict(entry, expires=time.time() + entry['ttl'])
+        with self.lock:
+            self.revalidated += 1
+            self._remember(key, entry)
+        self.save_to_disk(key, entry)
+        return entry
+    
+    def count_hit(self):
+        with self.lock:
+            self.hits += 1
+    
+    def count_miss(self):
+        with self.lock:
+            self.misses += 1
+    
+    def save_to_disk(self, key, entry):
+        if self.directory:
+            # Write a temporary file and swap it in, so a reader never
+            # sees a half-written file
+            path = self._path(key)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w') as file:
+                json.dump(entry, file)
+            os.replace(temp_path, path)
+    
+    def stats(self):
+        with self.lock:
+            hits, revalidated, misses = self.hits, self.revalidated, self.misses
+        total = hits + revalidated + misses
+        return {
+            'hits': hits,
+            'revalidated': revalidated,
+            'misses': misses,
+            'hit_ratio': (hits + revalidated) / total if total else 0.0,
+        }
+
+# Single-flight - when many threads ask for the same URL at the same
+# time, only the first one makes the request; the others wait for it
+# and get the same result.
+class SingleFlight:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}  # key -> {'done': Event, 'result': ...}
+    
+    def do(self, key, fetch):
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {'done': threading.Event(), 'result': None}
+        
+        if not leader:
+            call['done'].wait()
+            return call['result']
+        
+        try:
+            call['result'] = fetch()
+            return call['result']
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call['done'].set()
+
+# Same idea for asyncio: waiters share one task
+class AsyncSingleFlight:
+    def __init__(self):
+        self.calls = {}  # key -> asyncio.Task
+    
+    async def do(self, key, fetch):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+        # shield: one caller giving up must not cancel it for everyone else
+        return await asyncio.shield(task)
+
+# Streaming JSON - read a big array one item at a time while it downloads,
+# instead of loading and parsing the whole response first. Works for a
+# top-level array, or an object with the list under `field` (like GitHub's
+# {"total_count": ..., "items": [...]}). Fields that come before the list
+# are put into `header`.
+_json_decoder = json.JSONDecoder()
+
+def iter_json_items(chunks, field="items", header=None):
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    
+    def more():
+        # Append the next chunk; returns False when the stream is finished
+        nonlocal buffer, pos
+        chunk = next(chunks, None)
+        if chunk is None:
+            return False
+        buffer = buffer[pos:] + chunk  # Drop what we've already parsed
+        pos = 0
+        return True
+    
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer) or not more():
+                return
+    
+    def next_char():
+        skip_whitespace()
+        return buffer[pos] if pos < len(buffer) else None
+    
+    def decode_value():
+        # Only accept a value once a separator follows it, so a number cut in
+        # half by a chunk boundary ("12" of "123", "1." of "1.5") isn't
+        # returned too early
+        nonlocal pos
+        skip_whitespace()
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(buffer, pos)
+                after = len(buffer) - len(buffer[end:].lstrip())
+                if after < len(buffer) and buffer[after] in ",:]}":
+                    pos = end
+                    return value
+            except json.JSONDecodeError:
+                pass
+            if not more():
+                value, pos = _json_decoder.raw_decode(buffer, pos)  # Raises if truly broken
+                return value
+    
+    def expect(char):
+        nonlocal pos
+        if next_char() != char:
+            raise ValueError(f"Expected {char!r} in JSON stream")
+        pos += 1
+    
+    first = next_char()
+    if first == "{":
+        # Walk the top-level object until we reach the list we want
+        pos += 1
+        while True:
+            if next_char() == "}":
+                return  # Field not found
+            key = decode_value()
+            expect(":")
+            if key == field and next_char() == "[":
+                break
+            value = decode_value()
+            if header is not None:
+                header[key] = value
+            if next_char() == ",":
+                pos += 1
+    elif first != "[":
+        raise ValueError("Expected a JSON array or object")
+    
+    expect("[")
+    while True:
+        char = next_char()
+        if char == "]" or char is None:
+            return
+        if char == ",":
+            pos += 1
+            continue
+        yield decode_value()
+
 # Simple API wrapper class
+# Uses a Session, so connections stay open (keep-alive) and are reused
+# instead of doing a new TCP/TLS handshake for every request.
+from requests.adapters import HTTPAdapter
+
 class APIClient:
-    def __init__(self, base_url):
+    def __init__(self, base_url, pool_size=10, max_hosts=10, timeout=10, cache=None,
+                 coalesce=False, breaker=None, latency=None):
         self.base_url = base_url
+        self.timeout = timeout
+        self.breaker = breaker  # Optional CircuitBreaker
+        self.latency = latency  # Optional LatencyTracker for adaptive timeouts
+        self.cache = cache  # Optional ResponseCache for GET requests
+        # coalesce=True: identical GETs running at the same time share one request
+        self.single_flight = SingleFlight() if coalesce else None
+        self.session = requests.Session()
+        
+        # pool_maxsize = open connections kept per host,
+        # pool_connections = how many different hosts get a pool,
+        # pool_block = wait for a free connection instead of opening extra ones
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=pool_size,
+                              pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        
+        # requests decompresses gzip responses for us automatically
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+    
+    def get(self, endpoint, params=None):
+        if self.single_flight:
+            key = requests.Request('GET', f"{self.base_url}/{endpoint}", params=params).prepare().url
+            return self.single_flight.do(key, lambda: self._get(endpoint, params))
+        return self._get(endpoint, params)
     
-    def get(self, endpoint):
+    def _get(self, endpoint, params=None):
         url = f"{self.base_url}/{endpoint}"
+        if self.cache:
+            return self._cached_get(endpoint, url, params)
         try:
-            response = requests.get(url, timeout=10)
+            response = self._request("GET", url, params=params)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             print(f"Error: {e}")
             return None
     
+    def _cached_get(self, endpoint, url, params):
+        key = requests.Request('GET', url, params=params).prepare().url
+        try:
+            entry = self.cache.lookup(key)
+            if entry and entry['expires'] > time.time():
+                self.cache.count_hit()
+                return entry['data']
+            
+            # Ask the server whether our copy is still good
+            headers = {}
+            if entry and entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry and entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            
+            response = self._request("GET", url, params=params, headers=headers)
+            if response.status_code == 304 and entry:
+                return self.cache.revalidate(key, entry)['data']
+            
+            response.raise_for_status()
+            data = response.json()
+            self.cache.count_miss()
+            self.cache.store(key, endpoint, response, data)
+            return data
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+    
+    # Yield items one by one while downloading. Stopping the loop early
+    # closes the connection, so the rest of the body is never downloaded.
+    def get_stream(self, endpoint, params=None, field="items", header=None, chunk_size=65536):
+        url = f"{self.base_url}/{endpoint}"
+        with self.session.get(url, params=params, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            if response.encoding is None:
+                response.encoding = "utf-8"
+            chunks = response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+            yield from iter_json_items(chunks, field, header)
+    
+    # Pagination - yields items from every page as one stream.
+    # Follows the `Link: <...>; rel="next"` header or a cursor field in the
+    # body. With page_param (e.g. "page") it counts pages instead and stops
+    # at the first empty one. While you process one page, up to `prefetch`
+    # next pages are already being downloaded in the background.
+    def _fetch_page(self, url, params, items_field, cursor_field):
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.json()
+        items = body if isinstance(body, list) else body.get(items_field, [])
+        next_url = response.links.get('next', {}).get('url')
+        cursor = body.get(cursor_field) if isinstance(body, dict) else None
+        return items, next_url, cursor
+    
+    def paginate(self, endpoint, params=None, prefetch=4, page_param=None,
+                 cursor_param="cursor", cursor_field="next_cursor",
+                 items_field="items", max_pages=None):
+        url = f"{self.base_url}/{endpoint}"
+        params = dict(params or {})
+        if page_param:
+            yield from self._paginate_numbered(url, params, prefetch, page_param,
+                                               items_field, max_pages)
+        else:
+            yield from self._paginate_linked(url, params, prefetch, cursor_param,
+                                             cursor_field, items_field, max_pages)
+    
+    def _paginate_numbered(self, url, params, prefetch, page_param, items_field, max_pages):
+        # Page numbers are known in advance, so fetch several at once
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+        
+        first_page = int(params.get(page_param, 1))
+        last_page = first_page + max_pages - 1 if max_pages else None
+        
+        def fetch(page):
+            return self._fetch_page(url, {**params, page_param: page}, items_field, None)[0]
+        
+        executor = ThreadPoolExecutor(max_workers=max(prefetch, 1))
+        pending = deque()
+        next_page = first_page
+        try:
+            while True:
+                # Keep the pipeline full
+                while len(pending) <= prefetch and (last_page is None or next_page <= last_page):
+                    pending.append(executor.submit(fetch, next_page))
+                    next_page += 1
+                if not pending:
+                    return
+                items = pending.popleft().result()
+                if not items:
+                    return  # First empty page = end
+                yield from items
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _paginate_linked(self, url, params, prefetch, cursor_param, cursor_field,
+                         items_field, max_pages):
+        def walk_pages():
+            page_url, page_params, count = url, params, 0
+            while page_url:
+                items, next_url, cursor = self._fetch_page(page_url, page_params,
+                                                           items_field, cursor_field)
+                yield items
+                count += 1
+                if max_pages and count >= max_pages:
+                    return
+                if next_url:
+                    page_url, page_params = next_url, None  # Link URL has the params
+                elif cursor:
+                    page_params = {**params, cursor_param: cursor}
+                else:
+                    page_url = None
+        
+        if prefetch <= 0:
+            for items in walk_pages():
+                yield from items
+            return
+        
+        # Each page tells us where the next one is, so a background thread
+        # walks ahead and queues up to `prefetch` pages
+        pages = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        
+        def producer():
+            try:
+                for items in walk_pages():
+                    if stop.is_set():
+                        return
+                    pages.put(items)
+            except Exception as e:
+                pages.put(e)
+            pages.put(None)  # Done
+        
+        thread = threading.Thread(target=producer, daemon=True)
+        thread.start()
+        try:
+            while True:
+                items = pages.get()
+                if items is None:
+                    return
+                if isinstance(items, Exception):
+                    raise items
+                yield from items
+        finally:
+            # If the consumer stopped early, unblock the producer so it can exit
+            stop.set()
+            while thread.is_alive():
+                try:
+                    pages.get_nowait()
+                except queue.Empty:
+                    thread.join(0.01)
+    
+    def _request(self, method, url, **kwargs):
+        if self.breaker or self.latency:
+            return guarded_request(self.session, method, url, self.breaker, self.latency,
+                                   self.timeout, **kwargs)
+        return self.session.request(method, url, timeout=self.timeout, **kwargs)
+    
     def post(self, endpoint, data):
         url = f"{self.base_url}/{endpoint}"
         try:
-            response = requests.post(url, json=data, timeout=10)
+            response = self._request("POST", url, json=data)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             print(f"Error: {e}")
             return None
+    
+    def close(self):
+        self.session.close()
+
+# Async version of the client, with the same request coalescing
+class AsyncAPIClient:
+    def __init__(self, base_url, timeout=10, coalesce=True):
+        self.base_url = base_url
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+    
+    async def get(self, endpoint, params=None):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        if self.single_flight:
+            key = (endpoint, tuple(sorted((params or {}).items())))
+            return await self.single_flight.do(key, lambda: self._get(endpoint, params))
+        return await self._get(endpoint, params)
+    
+    async def _get(self, endpoint, params=None):
+        url = f"{self.base_url}/{endpoint}"
+        try:
+            async with self.session.get(url, params=params) as response:
+                response.raise_for_status()
+                return await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error: {e}")
+            return None
+    
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+# Batching POSTs - collect many small post() calls and send them as one
+# request with a JSON list. Each submit() returns a Future that gets its
+# own result when the batch comes back. If the server doesn't accept
+# batches, it falls back to one POST per item.
+from concurrent.futures import Future
+
+class PostBatcher:
+    def __init__(self, client, endpoint, batch_endpoint=None, max_batch=50, max_wait=0.05):
+        self.client = client
+        self.endpoint = endpoint
+        self.batch_url = f"{client.base_url}/{batch_endpoint or endpoint + '/batch'}"
+        self.max_batch = max_batch  # Send when this many are waiting...
+        self.max_wait = max_wait    # ...or when the oldest has waited this long (seconds)
+        self.batching_supported = True
+        self.pending = []  # (data, future)
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def submit(self, data):
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("PostBatcher is closed")
+            self.pending.append((data, future))
+            self.condition.notify()
+        return future
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return  # Closed and nothing left to send
+                
+                # Give the batch a short time window to fill up
+                deadline = time.monotonic() + self.max_wait
+                while len(self.pending) < self.max_batch and not self.closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                
+                batch = self.pending[:self.max_batch]
+                del self.pending[:self.max_batch]
+            try:
+                self._send(batch)
+            except Exception as e:
+                # Never let one bad batch kill the thread - later submits would hang
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    def _send(self, batch):
+        if self.batching_supported:
+            # Goes through the client's breaker and adaptive timeout too
+            response = self.client._request("POST", self.batch_url,
+                                            json=[data for data, _ in batch])
+            if response.status_code not in (404, 405, 501):
+                # The server took (or may have partly taken) the batch, so
+                # sending the items again one by one could store them twice
+                if 200 <= response.status_code < 300:
+                    try:
+                        results = response.json()
+                    except ValueError:
+                        results = None
+                    if isinstance(results, list) and len(results) == len(batch):
+                        for (_, future), result in zip(batch, results):
+                            future.set_result(result)
+                        return
+                    error = ValueError(f"Unexpected batch reply ({response.status_code})")
+                else:
+                    error = requests.HTTPError(f"Batch failed ({response.status_code})",
+                                               response=response)
+                for _, future in batch:
+                    future.set_exception(error)
+                return
+            
+            # No batch endpoint on this server - stop trying
+            print(f"No batch endpoint ({response.status_code}), sending one by one")
+            self.batching_supported = False
+        
+        for data, future in batch:
+            future.set_result(self.client.post(self.endpoint, data))
+    
+    def close(self):
+        # Sends whatever is still waiting, then stops the background thread
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
 
 # Using the wrapper
 # client = APIClient("https://jsonplaceholder.typicode.com")
 # posts = client.get("posts")
 # if posts:
-#     print(f"Fetched {len(posts)} posts")
\ No newline at end of file
+#     print(f"Fetched {len(posts)} posts")
+# batcher = PostBatcher(client, "posts")
+# futures = [batcher.submit({'title': f"Post {i}", 'userId': 1}) for i in range(100)]
+# print(futures[0].result())
+# batcher.close()
+# client.close()
+
+# Fail fast on a broken server, timeouts learned from real latency
+# client = APIClient("https://jsonplaceholder.typicode.com",
+#                    breaker=CircuitBreaker(), latency=LatencyTracker())
+
+# With a response cache (memory + disk); search results cached for 5 minutes
+# cache = ResponseCache(directory=".api_cache", ttl_overrides={"search/": 300})
+# github = APIClient("https://api.github.com", cache=cache)
+# search_repositories("python", client=github)
+# search_repositories("python", client=github)  # Served from cache
+# print(cache.stats())
+
+# Local stand-in server for benchmarks - no internet or rate limits needed
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class LocalAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Needed for keep-alive
+    disable_nagle_algorithm = True  # Don't delay small responses on reused connections
+    
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+    
+    def do_GET(self):
+        self.send_json({'path': self.path})
+    
+    def do_POST(self):
+        self.send_json(self.read_json(), status=201)
+    
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet
+
+def start_local_server(handler=LocalAPIHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)  # Port 0 = any free port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+# Benchmark: new connection per call vs pooled keep-alive session
+def benchmark_api_client(num_calls=1000):
+    server, base_url = start_local_server()
+    
+    start = time.perf_counter()
+    for i in range(num_calls):
+        requests.get(f"{base_url}/posts/{i}", timeout=10).json()
+    plain = time.perf_counter() - start
+    
+    client = APIClient(base_url)
+    start = time.perf_counter()
+    for i in range(num_calls):
+        client.get(f"posts/{i}")
+    pooled = time.perf_counter() - start
+    client.close()
+    server.shutdown()
+    
+    print(f"requests.get: {plain / num_calls * 1000:.2f} ms per call")
+    print(f"APIClient:    {pooled / num_calls * 1000:.2f} ms per call")
+
+# benchmark_api_client()
+
+# Stand-in server that supports ETag revalidation
+class CachingAPIHandler(LocalAPIHandler):
+    def do_GET(self):
+        etag = '"' + hashlib.sha1(self.path.encode()).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        items = [{'id': i, 'title': f"Post {i}"} for i in range(2000)]
+        self.send_json(items, headers={"ETag": etag, "Cache-Control": "max-age=1"})
+
+# Benchmark: repeat calls with and without the response cache
+def benchmark_response_cache(num_calls=200):
+    server, base_url = start_local_server(CachingAPIHandler)
+    
+    for label, cache in [("No cache", None), ("ResponseCache", ResponseCache())]:
+        client = APIClient(base_url, cache=cache)
+        start = time.perf_counter()
+        for i in range(num_calls):
+            client.get("posts")
+            if i % 50 == 49:
+                time.sleep(1.1)  # Let max-age expire now and then -> 304s
+        elapsed = time.perf_counter() - start - 1.1 * (num_calls // 50)
+        print(f"{label}: {elapsed / num_calls * 1000:.2f} ms per call")
+        if cache:
+            print(cache.stats())
+        client.close()
+    server.shutdown()
+
+# benchmark_response_cache()
+
+# Stand-in server that counts requests and answers slowly
+class CountingAPIHandler(LocalAPIHandler):
+    request_count = 0
+    
+    def do_GET(self):
+        CountingAPIHandler.request_count += 1
+        time.sleep(0.2)  # Slow upstream, so the calls overlap
+        self.send_json({'path': self.path})
+
+# Load test: 100 identical calls at once should reach the server once
+def benchmark_single_flight(num_callers=100):
+    from concurrent.futures import ThreadPoolExecutor
+    
+    server, base_url = start_local_server(CountingAPIHandler)
+    
+    client = APIClient(base_url, pool_size=num_callers, coalesce=True)
+    with ThreadPoolExecutor(max_workers=num_callers) as executor:
+        results = list(executor.map(lambda _: client.get("report"), range(num_callers)))
+    client.close()
+    print(f"Threads: {len(results)} calls -> {CountingAPIHandler.request_count} upstream request(s)")
+    
+    CountingAPIHandler.request_count = 0
+    
+    async def run_async():
+        async_client = AsyncAPIClient(base_url)
+        results = await asyncio.gather(*(async_client.get("report") for _ in range(num_callers)))
+        await async_client.close()
+        return results
+    
+    results = asyncio.run(run_async())
+    print(f"Async:   {len(results)} calls -> {CountingAPIHandler.request_count} upstream request(s)")
+    server.shutdown()
+
+# benchmark_single_flight()
+
+# Stand-in server that sends one big JSON array (size in MB from the path)
+class BigPayloadHandler(LocalAPIHandler):
+    def do_GET(self):
+        size_mb = int(self.path.strip("/").split("/")[-1] or 1)
+        item = json.dumps({'id': 1, 'title': 'x' * 80, 'body': 'y' * 400}).encode()
+        count = size_mb * 1024 * 1024 // (len(item) + 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(count * (len(item) + 1) + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(b"[")
+            batch = b",".join([item] * 1000)
+            for sent in range(0, count, 1000):
+                n = min(1000, count - sent)
+                data = batch if n == 1000 else b",".join([item] * n)
+                self.wfile.write(data + (b"," if sent + n < count else b"]"))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client stopped reading early - that's the point
+
+# Benchmark: full .json() vs streaming, for the first 5 items
+def benchmark_streaming_json(size_mb=200):
+    import tracemalloc
+    
+    server, base_url = start_local_server(BigPayloadHandler)
+    client = APIClient(base_url)
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = client.get(f"big/{size_mb}")[:5]
+    full_time = time.perf_counter() - start
+    full_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del first
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    first = list(islice(client.get_stream(f"big/{size_mb}"), 5))
+    stream_time = time.perf_counter() - start
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    print(f"{size_mb} MB payload, first 5 items")
+    print(f"response.json(): {full_time:.2f}s, peak {full_peak / 1e6:.0f} MB")
+    print(f"get_stream():    {stream_time:.3f}s, peak {stream_peak / 1e6:.1f} MB")
+    client.close()
+    server.shutdown()
+
+# benchmark_streaming_json()
+
+# Stand-in server with 1,000 pages of 10 items, linked by Link headers.
+# /items?page=N works too. Each page takes 10 ms, like a real network.
+class PagedAPIHandler(LocalAPIHandler):
+    total_pages = 1000
+    
+    def do_GET(self):
+        from urllib.parse import urlparse, parse_qs
+        
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get('page', ['1'])[0])
+        time.sleep(0.01)
+        
+        if page > self.total_pages:
+            self.send_json({'items': []})
+            return
+        items = [{'id': (page - 1) * 10 + i} for i in range(10)]
+        headers = {}
+        if page < self.total_pages:
+            next_url = f"http://127.0.0.1:{self.server.server_port}/items?page={page + 1}"
+            headers['Link'] = f'<{next_url}>; rel="next"'
+        self.send_json({'items': items}, headers=headers)
+
+# Benchmark: 1,000-page crawl, with 5 ms of "work" per page
+def benchmark_paginate(prefetch=4):
+    server, base_url = start_local_server(PagedAPIHandler)
+    client = APIClient(base_url, pool_size=prefetch + 2)
+    
+    runs = [
+        ("Link, no prefetch", {'prefetch': 0}),
+        ("Link, prefetch", {'prefetch': prefetch}),
+        ("Page numbers, prefetch", {'prefetch': prefetch, 'page_param': 'page'}),
+    ]
+    for label, options in runs:
+        start = time.perf_counter()
+        count = 0
+        for item in client.paginate("items", **options):
+            count += 1
+            if count % 10 == 0:
+                time.sleep(0.005)  # Process a page
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {count} items in {elapsed:.2f}s")
+    
+    client.close()
+    server.shutdown()
+
+# benchmark_paginate()
+
+# Stand-in server with a batch endpoint: POST /posts/batch takes a list
+class BatchAPIHandler(LocalAPIHandler):
+    accept_batches = True
+    
+    def do_POST(self):
+        data = self.read_json()
+        if self.path.endswith("/batch"):
+            if not self.accept_batches:
+                self.send_json({'error': 'not found'}, status=404)
+                return
+            self.send_json([dict(item, id=i) for i, item in enumerate(data)], status=201)
+        else:
+            self.send_json(dict(data, id=1), status=201)
+
+# Benchmark: writes per second, one POST per item vs batched
+def benchmark_post_batching(num_posts=2000):
+    server, base_url = start_local_server(BatchAPIHandler)
+    client = APIClient(base_url)
+    
+    start = time.perf_counter()
+    for i in range(num_posts):
+        client.post("posts", {'title': f"Post {i}"})
+    single = time.perf_counter() - start
+    
+    batcher = PostBatcher(client, "posts", max_batch=100)
+    start = time.perf_counter()
+    futures = [batcher.submit({'title': f"Post {i}"}) for i in range(num_posts)]
+    for future in futures:
+        future.result()
+    batched = time.perf_counter() - start
+    batcher.close()
+    
+    print(f"One by one: {num_posts / single:,.0f} writes/s")
+    print(f"Batched:    {num_posts / batched:,.0f} writes/s")
+    client.close()
+    server.shutdown()
+
+# benchmark_post_batching()
+
+# Stand-in server with injected faults: every 200th answer is very slow,
+# and there is an outage (HTTP 503) from 1s to 2s after the start
+class FlakyAPIHandler(LocalAPIHandler):
+    request_count = 0
+    started = 0
+    
+    def do_GET(self):
+        FlakyAPIHandler.request_count += 1
+        if 1.0 <= time.monotonic() - FlakyAPIHandler.started < 2.0:
+            self.send_json({'error': 'unavailable'}, status=503)
+            return
+        time.sleep(2 if FlakyAPIHandler.request_count % 200 == 0 else 0.002)
+        try:
+            self.send_json({'path': self.path})
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client already gave up (timeout)
+
+# Benchmark: tail latency with a fixed timeout vs breaker + adaptive timeout
+def benchmark_circuit_breaker(num_calls=1000):
+    for label, options in [("Fixed timeout", {}),
+                           ("Breaker + adaptive", {'breaker': CircuitBreaker(reset_timeout=0.5),
+                                                   'latency': LatencyTracker()})]:
+        FlakyAPIHandler.request_count = 0
+        FlakyAPIHandler.started = time.monotonic()
+        server, base_url = start_local_server(FlakyAPIHandler)
+        client = APIClient(base_url, **options)
+        
+        latencies = []
+        for i in range(num_calls):
+            start = time.perf_counter()
+            client.get(f"users/{i}")
+            latencies.append(time.perf_counter() - start)
+            time.sleep(0.002)  # The caller's own work between requests
+        
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{label}: p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms, total {sum(latencies):.1f}s, "
+              f"upstream calls {FlakyAPIHandler.request_count}")
+        client.close()
+        server.shutdown()
+
+# benchmark_circuit_breaker()
@@ -4,6 +4,14 @@
 import requests
 from bs4 import BeautifulSoup
 
+# Use the fast lxml parser (written in C) when it's installed:
+# pip install lxml. Otherwise fall back to Python's built-in parser.
+try:
+    import lxml
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 # Basic web scraping example
 def fetch_webpage(url):
     try:
@@ -16,7 +24,7 @@ def fetch_webpage(url):
 
 # Parse HTML content
 def parse_html(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, HTML_PARSER)
     return soup
 
 # Example: Scraping a simple webpage
@@ -42,7 +50,7 @@ def scrape_example():
 
 # Finding elements by different selectors
 def find_elements_example(html):
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = BeautifulSoup(html, HTML_PARSER)
     
     # Find by tag name
     title = soup.find('h1')
@@ -69,7 +77,7 @@ def scrape_with_headers(url):
     
     try:
         response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         return soup
     except Exception as e:
         print(f"Error: {e}")
@@ -107,24 +115,18 @@ def scrape_table(url):
             print(row_data)
 
 # Handling pagination
-def scrape_multiple_pages(base_url, num_pages):
-    all_data = []
+# Uses the AsyncCrawler (below) to fetch pages concurrently, while still
+# waiting `delay` seconds between requests to the same site
+def scrape_multiple_pages(base_url, num_pages, delay=1):
+    urls = [f"{base_url}?page={page}" for page in range(1, num_pages + 1)]
+    pages = crawl(urls, per_host_rate=1 / delay if delay > 0 else 0,
+                  parse=lambda url, html: parse_html(html))
     
-    for page in range(1, num_pages + 1):
-        url = f"{base_url}?page={page}"
-        print(f"Scraping page {page}...")
-        
-        html = fetch_webpage(url)
-        if html:
-            soup = parse_html(html)
+    all_data = []
+    for url in urls:
+        if url in pages:
             # Extract data from this page
-            items = soup.find_all('div', class_='item')
-            all_data.extend(items)
-        
-        # Be respectful - wait between requests
-        import time
-        time.sleep(1)
-    
+            all_data.extend(pages[url].find_all('div', class_='item'))
     return all_data
 
 # Extracting specific attributes
@@ -216,7 +218,7 @@ def safe_scrape(url):
         response = requests.get(url, timeout=10)
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.text, HTML_PARSER)
         
         # Try to find specific elements
         title = soup.find('h1')
@@ -242,43 +244,425 @@ def check_robots_txt(base_url):
     except Exception as e:
         print(f"No robots.txt found: {e}")
 
+# Robots.txt rules, parsed once per host and cached
+# can_fetch() walks a trie of Allow/Disallow paths one character at a
+# time, so a check costs the length of the URL path - not the number of
+# rules. The longest matching rule wins; on a tie, Allow wins.
+import re
+import time
+from urllib.parse import urlsplit
+
+class RobotsRules:
+    def __init__(self, text='', user_agent='*'):
+        self.trie = {}        # char -> child node; the None key holds allow/disallow
+        self.wildcards = []   # (regex, length, allow) for rules with * or $
+        self.crawl_delay = None
+        
+        groups = []           # (agents, rules, crawl_delay)
+        in_agents = False
+        for line in text.splitlines():
+            line = line.split('#', 1)[0].strip()
+            if ':' not in line:
+                continue
+            key, value = line.split(':', 1)
+            key, value = key.strip().lower(), value.strip()
+            if key == 'user-agent':
+                if not in_agents:
+                    groups.append(([], [], None))
+                    in_agents = True
+                groups[-1][0].append(value.lower())
+                continue
+            in_agents = False
+            if not groups:
+                continue
+            if key in ('allow', 'disallow') and value:
+                groups[-1][1].append((value, key == 'allow'))
+            elif key == 'crawl-delay':
+                try:
+                    groups[-1] = (groups[-1][0], groups[-1][1], float(value))
+                except ValueError:
+                    pass
+        
+        # Use the groups naming our bot; only if there are none, the '*' groups
+        agent = user_agent.lower()
+        chosen = [g for g in groups if any(a != '*' and a in agent for a in g[0])]
+        if not chosen:
+            chosen = [g for g in groups if '*' in g[0]]
+        for _, rules, crawl_delay in chosen:
+            for path, allow in rules:
+                self.add_rule(path, allow)
+            if crawl_delay is not None:
+                self.crawl_delay = crawl_delay
+    
+    def add_rule(self, path, allow):
+        if '*' in path or path.endswith('$'):
+            anchored = path.endswith('$')
+            pattern = '.*'.join(re.escape(part) for part in path.rstrip('$').split('*'))
+            self.wildcards.append((re.compile(pattern + ('$' if anchored else '')),
+                                   len(path), allow))
+            return
+        node = self.trie
+        for char in path:
+            node = node.setdefault(char, {})
+        node[None] = node.get(None, False) or allow
+    
+    def can_fetch(self, path):
+        if path == '/robots.txt':
+            return True
+        best_length, allowed = 0, True
+        node = self.trie
+        for i, char in enumerate(path, 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if None in node:
+                best_length, allowed = i, node[None]
+        for pattern, length, allow in self.wildcards:
+            if (length > best_length or (length == best_length and allow)) and pattern.match(path):
+                best_length, allowed = length, allow
+        return allowed
+
+ALLOW_ALL = RobotsRules()
+DISALLOW_ALL = RobotsRules("User-agent: *\nDisallow: /")
+
+class RobotsCache:
+    def __init__(self, user_agent='*', ttl=24 * 3600, error_ttl=300):
+        self.user_agent = user_agent
+        self.ttl = ttl                # Re-download robots.txt after this many seconds
+        self.error_ttl = error_ttl    # Server errors: stay away, but retry sooner
+        self.entries = {}             # "scheme://host" -> (expires, RobotsRules)
+    
+    @staticmethod
+    def split(url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return origin, path
+    
+    def store(self, origin, status, text):
+        # 4xx: no robots.txt, everything is allowed.
+        # 5xx or no answer: assume everything is disallowed for now.
+        if status is not None and 200 <= status < 300:
+            rules, ttl = RobotsRules(text, self.user_agent), self.ttl
+        elif status is not None and 400 <= status < 500:
+            rules, ttl = ALLOW_ALL, self.ttl
+        else:
+            rules, ttl = DISALLOW_ALL, self.error_ttl
+        self.entries[origin] = (time.monotonic() + ttl, rules)
+        return rules
+    
+    def cached(self, origin):
+        entry = self.entries.get(origin)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+    
+    def rules_for(self, url):
+        origin, _ = self.split(url)
+        rules = self.cached(origin)
+        if rules is None:
+            try:
+                response = requests.get(f"{origin}/robots.txt", timeout=10,
+                                        headers={'User-Agent': self.user_agent})
+                rules = self.store(origin, response.status_code, response.text)
+            except requests.RequestException:
+                rules = self.store(origin, None, '')
+        return rules
+    
+    def can_fetch(self, url):
+        origin, path = self.split(url)
+        rules = self.cached(origin) or self.rules_for(url)
+        return rules.can_fetch(path)
+    
+    def crawl_delay(self, url):
+        return self.rules_for(url).crawl_delay
+
+# robots = RobotsCache(user_agent='PythonBasicsCrawler')
+# if robots.can_fetch("http://example.com/private/page"):
+#     ...
+
 # Complete scraper example
+# Parsing HTML is slow, CPU-heavy work. With parse_workers > 0 it runs in
+# separate processes (one per CPU core is a good start), so several pages
+# are parsed at the same time. Only the extracted text comes back - soup
+# objects stay in the worker process.
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Compiled CSS selectors - soup.select() parses the selector string on
+# every call; compiling it once and caching it skips that work.
+from functools import lru_cache
+import soupsieve
+from bs4 import SoupStrainer
+
+@lru_cache(maxsize=256)
+def compile_selector(selector):
+    return soupsieve.compile(selector)
+
+# "Strainer" mode: only build the parts of the page the selector can
+# match. For "div.item h2" we only keep <div class="item"> elements (and
+# everything inside them) and skip the rest of the tree. Only plain
+# descendant/child chains of tag/.class/#id parts qualify; anything else
+# (commas, "+" and "~" siblings, attributes, pseudo-classes) gets a full
+# parse.
+_SIMPLE_PART = re.compile(r'^([a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$')
+
+@lru_cache(maxsize=256)
+def strainer_for(selector):
+    parts = selector.replace('>', ' ').split()
+    if not parts or not all(part and _SIMPLE_PART.match(part) for part in parts):
+        return None
+    tag, rest = _SIMPLE_PART.match(parts[0]).groups()
+    attrs = {}
+    for kind, value in re.findall(r'([.#])([\w-]+)', rest):
+        if kind == '#':
+            attrs['id'] = value
+        elif 'class' not in attrs:
+            # The strainer sees the raw attribute ("item featured"),
+            # so match the class as a whole word
+            attrs['class'] = re.compile(rf'(^|\s){re.escape(value)}(\s|$)')
+    return SoupStrainer(tag or True, attrs)
+
+def select(soup, selector):
+    return compile_selector(selector).select(soup)
+
+# Runs inside a worker process, so it must be a plain top-level function
+def extract_texts_from_html(html, selector, strain=False):
+    strainer = strainer_for(selector) if strain else None
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+    return [element.text.strip() for element in select(soup, selector)]
+
+# Crawl state for re-crawls: per URL, the validators the server sent
+# (ETag, Last-Modified) plus hashes of the page and of every item found
+# on it. Stored in SQLite so it survives between runs.
+import hashlib
+import json
+import sqlite3
+import threading
+
+class CrawlState:
+    def __init__(self, filename='crawl_state.db'):
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                item_hashes TEXT,
+                crawled_at REAL
+            )
+        """)
+        self.conn.commit()
+        self.lock = threading.Lock()  # Fetch threads share the connection
+    
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, content_hash, item_hashes FROM pages WHERE url = ?",
+                (url,)).fetchone()
+        if row is None:
+            return None
+        return {'etag': row[0], 'last_modified': row[1], 'content_hash': row[2],
+                'item_hashes': json.loads(row[3] or '[]')}
+    
+    def save(self, url, etag, last_modified, content_hash, item_hashes):
+        with self.lock, self.conn:
+            self.conn.execute("""
+                INSERT INTO pages (url, etag, last_modified, content_hash, item_hashes, crawled_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content_hash = excluded.content_hash,
+                    item_hashes = excluded.item_hashes,
+                    crawled_at = excluded.crawled_at
+            """, (url, etag, last_modified, content_hash, json.dumps(item_hashes), time.time()))
+    
+    def touch(self, url, etag=None, last_modified=None):
+        # Page hasn't changed: only refresh the validators and the timestamp
+        with self.lock, self.conn:
+            self.conn.execute("""
+                UPDATE pages SET etag = COALESCE(?, etag),
+                                 last_modified = COALESCE(?, last_modified),
+                                 crawled_at = ?
+                WHERE url = ?
+            """, (etag, last_modified, time.time(), url))
+    
+    def close(self):
+        self.conn.close()
+
+def item_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
 class WebScraper:
-    def __init__(self, base_url):
+    def __init__(self, base_url, parse_workers=0, strain=False, robots=None, state=None):
         self.base_url = base_url
+        self.strain = strain  # Only build the parts of the page selectors need
+        self.robots = robots  # RobotsCache; None means robots.txt isn't checked
+        self.state = state    # CrawlState; re-crawls then only handle changed pages
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.executor = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers else None
     
-    def fetch_page(self, path=''):
+    def fetch_html(self, path=''):
         url = self.base_url + path
+        if self.robots and not self.robots.can_fetch(url):
+            print(f"Skipping {url}: disallowed by robots.txt")
+            return None
         try:
             response = requests.get(url, headers=self.headers, timeout=10)
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            return response.text
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
     
+    def fetch_page(self, path=''):
+        html = self.fetch_html(path)
+        if html is None:
+            return None
+        return BeautifulSoup(html, HTML_PARSER)
+    
     def extract_data(self, soup, selector):
         if soup:
-            return soup.select(selector)
+            return select(soup, selector)
         return []
     
+    def _submit_parse(self, html, selector):
+        if self.executor:
+            return self.executor.submit(extract_texts_from_html, html, selector, self.strain)
+        future = Future()  # No pool: parse right here
+        future.set_result(extract_texts_from_html(html, selector, self.strain))
+        return future
+    
+    def extract_texts(self, path, selector):
+        html = self.fetch_html(path)
+        if html is None:
+            return []
+        return self._submit_parse(html, selector).result()
+    
+    def scrape_many(self, paths, selector, fetch_workers=8):
+        # Downloads run in threads, parsing in the process pool; while one
+        # page is being parsed the next ones are already downloading
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+            futures = [
+                self._submit_parse(html, selector) if html is not None else None
+                for html in fetch_pool.map(self.fetch_html, paths)
+            ]
+        return [future.result() if future else None for future in futures]
+    
+    def _require_state(self):
+        if self.state is None:
+            raise ValueError("Re-crawls need a CrawlState: WebScraper(..., state=CrawlState())")
+    
+    def fetch_if_changed(self, path=''):
+        # Conditional GET. Returns (status, page): status is 'changed',
+        # 'not_modified' (304), 'unchanged' (same content hash) or 'error';
+        # page is only set for 'changed' pages
+        self._require_state()
+        url = self.base_url + path
+        if self.robots and not self.robots.can_fetch(url):
+            print(f"Skipping {url}: disallowed by robots.txt")
+            return 'error', None
+        previous = self.state.get(url)
+        headers = dict(self.headers)
+        if previous and previous['etag']:
+            headers['If-None-Match'] = previous['etag']
+        if previous and previous['last_modified']:
+            headers['If-Modified-Since'] = previous['last_modified']
+        try:
+            response = requests.get(url, headers=headers, timeout=10)
+            if response.status_code == 304:
+                self.state.touch(url)
+                return 'not_modified', None
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return 'error', None
+        
+        # The server may not support conditional requests (or may send a
+        # fresh ETag for the same page) - the content hash still catches it
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if previous and previous['content_hash'] == content_hash:
+            self.state.touch(url, etag, last_modified)
+            return 'unchanged', None
+        return 'changed', {
+            'url': url, 'html': response.text, 'etag': etag, 'last_modified': last_modified,
+            'content_hash': content_hash,
+            'item_hashes': previous['item_hashes'] if previous else [],
+        }
+    
+    def _save_page(self, page, texts):
+        # Remember this version of the page; return the items that are new
+        hashes = [item_hash(text) for text in texts]
+        seen = set(page['item_hashes'])
+        self.state.save(page['url'], page['etag'], page['last_modified'],
+                        page['content_hash'], hashes)
+        return [text for text, digest in zip(texts, hashes) if digest not in seen]
+    
+    def scrape_changed(self, paths, selector, fetch_workers=8):
+        # Re-crawl: returns {path: new items} for the pages that changed.
+        # Pages that didn't change are neither parsed nor returned.
+        self._require_state()
+        self.recrawl_stats = dict.fromkeys(['changed', 'not_modified', 'unchanged', 'error'], 0)
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+            fetched = list(fetch_pool.map(self.fetch_if_changed, paths))
+        
+        parsing = {}
+        for path, (status, page) in zip(paths, fetched):
+            self.recrawl_stats[status] += 1
+            if page:
+                parsing[path] = (page, self._submit_parse(page['html'], selector))
+        
+        changes = {}
+        for path, (page, future) in parsing.items():
+            new_items = self._save_page(page, future.result())
+            if new_items:
+                changes[path] = new_items
+        return changes
+    
     def scrape_and_save(self, selector, filename):
-        soup = self.fetch_page()
-        if soup:
-            elements = self.extract_data(soup, selector)
-            
+        if self.state is None:
+            texts = new_items = self.extract_texts('', selector)
+        else:
+            # Re-crawl: leave the file alone unless the page changed
+            status, page = self.fetch_if_changed('')
+            if page is None:
+                print(f"{self.base_url}: {status.replace('_', ' ')}, nothing to update")
+                return []
+            texts = self._submit_parse(page['html'], selector).result()
+            new_items = self._save_page(page, texts)
+        
+        if texts:
             with open(filename, 'w', encoding='utf-8') as file:
-                for element in elements:
-                    file.write(element.text.strip() + '\n')
+                for text in texts:
+                    file.write(text + '\n')
             
-            print(f"Scraped {len(elements)} items to {filename}")
+            print(f"Scraped {len(texts)} items to {filename} ({len(new_items)} new)")
+        return new_items
+    
+    def close(self):
+        if self.executor:
+            self.executor.shutdown()
 
 # Usage example
 # scraper = WebScraper("http://example.com")
 # scraper.scrape_and_save('.article-title', 'articles.txt')
+# fast = WebScraper("http://example.com", parse_workers=os.cpu_count())
+# titles = fast.scrape_many(['/page1', '/page2', '/page3'], '.article-title')
+# fast.close()
+# Daily re-crawl: unchanged pages come back as 304s and are skipped
+# daily = WebScraper("http://example.com", state=CrawlState("example_state.db"))
+# new_titles = daily.scrape_changed(['/page1', '/page2', '/page3'], '.article-title')
+# print(daily.recrawl_stats)
 
 # Important notes about web scraping:
 """
@@ -298,19 +682,413 @@ class WebScraper:
 import time
 
 def rate_limited_scraper(urls, delay=2):
-    results = []
+    # At most one request per `delay` seconds to each host; different
+    # hosts are crawled at the same time
+    pages = crawl(urls, per_host_rate=1 / delay if delay > 0 else 0,
+                  parse=lambda url, html: parse_html(html))
+    return [pages[url] for url in urls if url in pages]
+
+# Async crawl engine
+# A frontier (queue) of URLs, a global limit on requests in flight, and a
+# per-host limit so no single site is hammered. URLs are deduplicated,
+# failures are retried with backoff, and each result goes to a sink as
+# soon as it's ready.
+# Note: Requires aiohttp library: pip install aiohttp
+import asyncio
+import json
+import aiohttp
+from urllib.parse import urljoin, urldefrag, urlparse
+
+class HostLimiter:
+    def __init__(self, rate=1.0, concurrency=2):
+        # Seconds between requests to one host; a rate of 0 means no spacing
+        self.default_delay = 1 / rate if rate > 0 else 0
+        self.concurrency = concurrency
+        self.delays = {}      # host -> custom delay (e.g. robots.txt Crawl-delay)
+        self.next_time = {}   # host -> earliest time for the next request
+        self.semaphores = {}
+    
+    def set_delay(self, host, seconds):
+        self.delays[host] = max(seconds, self.default_delay)
     
-    for i, url in enumerate(urls, 1):
-        print(f"Scraping {i}/{len(urls)}...")
+    async def acquire(self, host):
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.concurrency)
+        await self.semaphores[host].acquire()
         
-        html = fetch_webpage(url)
-        if html:
-            soup = parse_html(html)
-            # Process soup here
-            results.append(soup)
+        # Reserve the next free time slot for this host, then wait for it
+        now = time.monotonic()
+        slot = max(now, self.next_time.get(host, now))
+        self.next_time[host] = slot + self.delays.get(host, self.default_delay)
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    def release(self, host):
+        self.semaphores[host].release()
+
+def default_parse(url, html):
+    soup = BeautifulSoup(html, HTML_PARSER)
+    title = soup.find('title')
+    return {
+        'url': url,
+        'title': title.text.strip() if title else '',
+        'links': [a['href'] for a in soup.find_all('a', href=True)],
+    }
+
+class JsonLinesSink:
+    # Writes one JSON object per line as results arrive
+    def __init__(self, filename):
+        self.file = open(filename, 'w', encoding='utf-8')
+    
+    def __call__(self, result):
+        self.file.write(json.dumps(result) + '\n')
+    
+    def close(self):
+        self.file.close()
+
+class AsyncCrawler:
+    def __init__(self, concurrency=20, per_host_rate=1.0, per_host_concurrency=2,
+                 max_retries=3, timeout=10, parse=default_parse, sink=None,
+                 follow_links=False, same_host_only=True, max_pages=None, headers=None,
+                 robots=None):
+        self.concurrency = concurrency  # Requests in flight across all hosts
+        self.limiter = HostLimiter(per_host_rate, per_host_concurrency)
+        self.max_retries = max_retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.parse = parse            # parse(url, html) -> result
+        self.sink = sink              # sink(result), sync or async; default: keep in self.results
+        self.follow_links = follow_links
+        self.same_host_only = same_host_only
+        self.max_pages = max_pages
+        self.headers = headers or {'User-Agent': 'Mozilla/5.0 (compatible; PythonBasicsCrawler)'}
+        self.robots = robots          # RobotsCache: skip disallowed URLs, obey Crawl-delay
+        self.robots_pending = {}      # origin -> task, so each robots.txt is downloaded once
+        self.results = {}
+        self.seen = set()
+        self.pages_crawled = 0
+        self.failed = 0
+        self.blocked = 0
+    
+    @staticmethod
+    def normalize(url):
+        url, _ = urldefrag(url)  # "page#top" and "page" are the same page
+        parts = urlparse(url)
+        return parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()).geturl()
+    
+    def add_url(self, queue, url):
+        url = self.normalize(url)
+        if url in self.seen:
+            return
+        if self.max_pages and len(self.seen) >= self.max_pages:
+            return
+        self.seen.add(url)
+        queue.put_nowait(url)
+    
+    async def download_robots(self, session, origin):
+        try:
+            async with session.get(f"{origin}/robots.txt") as response:
+                rules = self.robots.store(origin, response.status, await response.text())
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            rules = self.robots.store(origin, None, '')
+        return rules
+    
+    async def allowed(self, session, url):
+        origin, path = self.robots.split(url)
+        rules = self.robots.cached(origin)
+        if rules is None:
+            if origin not in self.robots_pending:
+                self.robots_pending[origin] = asyncio.ensure_future(
+                    self.download_robots(session, origin))
+            try:
+                rules = await asyncio.shield(self.robots_pending[origin])
+            finally:
+                self.robots_pending.pop(origin, None)
+        # Rules may come from a cache shared with other crawlers, so
+        # apply Crawl-delay whenever we look them up, not just on download
+        if rules.crawl_delay:
+            self.limiter.set_delay(urlparse(origin).netloc, rules.crawl_delay)
+        return rules.can_fetch(path)
+    
+    async def fetch(self, session, url):
+        host = urlparse(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire(host)
+            try:
+                async with session.get(url) as response:
+                    if response.status == 200:
+                        return await response.text()
+                    if response.status != 429 and response.status < 500:
+                        return None  # 404 etc. - not worth retrying
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Attempt {attempt + 1} failed for {url}: {e}")
+            finally:
+                self.limiter.release(host)
+            
+            if attempt < self.max_retries:
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        return None
+    
+    async def emit(self, url, result):
+        if self.sink is None:
+            self.results[url] = result
+            return
+        outcome = self.sink(result)
+        if asyncio.iscoroutine(outcome):
+            await outcome
+    
+    async def worker(self, session, queue):
+        while True:
+            url = await queue.get()
+            try:
+                if self.robots and not await self.allowed(session, url):
+                    self.blocked += 1
+                    continue
+                html = await self.fetch(session, url)
+                if html is None:
+                    self.failed += 1
+                    continue
+                self.pages_crawled += 1
+                result = self.parse(url, html)
+                await self.emit(url, result)
+                
+                if self.follow_links and isinstance(result, dict):
+                    for link in result.get('links', []):
+                        link = urljoin(url, link)
+                        if not link.startswith(('http://', 'https://')):
+                            continue
+                        if self.same_host_only and urlparse(link).netloc != urlparse(url).netloc:
+                            continue
+                        self.add_url(queue, link)
+            except Exception as e:
+                self.failed += 1
+                print(f"Error processing {url}: {e}")
+            finally:
+                queue.task_done()
+    
+    async def run(self, start_urls):
+        queue = asyncio.Queue()
+        for url in start_urls:
+            self.add_url(queue, url)
         
-        # Wait between requests
-        if i < len(urls):
-            time.sleep(delay)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                         headers=self.headers) as session:
+            workers = [asyncio.create_task(self.worker(session, queue))
+                       for _ in range(self.concurrency)]
+            await queue.join()  # Every queued URL has been processed
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return self.results
+
+def crawl(urls, **options):
+    # Blocking helper: crawl and return {url: result}
+    crawler = AsyncCrawler(**options)
+    results = asyncio.run(crawler.run(urls))
+    # Results are keyed by normalized URL; map them back to what was passed in
+    return {url: results[AsyncCrawler.normalize(url)]
+            for url in urls if AsyncCrawler.normalize(url) in results}
+
+# crawler = AsyncCrawler(concurrency=20, per_host_rate=5, follow_links=True, max_pages=500,
+#                        sink=JsonLinesSink("pages.jsonl"),
+#                        robots=RobotsCache(user_agent='PythonBasicsCrawler'))
+# asyncio.run(crawler.run(["http://quotes.toscrape.com/"]))
+# crawler.sink.close()
+
+# Local test site for benchmarks: /page/N links to pages 2N and 2N+1
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class LocalSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    num_pages = 10000
     
-    return results
\ No newline at end of file
+    def page_html(self, n):
+        links = ''.join(f'<a href="/page/{k}">Page {k}</a>'
+                        for k in (2 * n, 2 * n + 1) if k <= self.num_pages)
+        return (f"<html><head><title>Page {n}</title></head><body>"
+                f"<h1>Page {n}</h1><div class='item'>Item {n}</div>{links}</body></html>")
+    
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path.startswith('/page/') and path[6:].isdigit() and 1 <= int(path[6:]) <= self.num_pages:
+            body = self.page_html(int(path[6:])).encode()
+            self.send_response(200)
+        else:
+            body = b"Not found"
+            self.send_response(404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_local_site(handler=LocalSiteHandler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+# Benchmark: crawl the whole local site, limited only by the per-host rate
+def benchmark_crawler(num_pages=10000, per_host_rate=500, concurrency=50):
+    LocalSiteHandler.num_pages = num_pages
+    server, base_url = start_local_site()
+    crawler = AsyncCrawler(concurrency=concurrency, per_host_rate=per_host_rate,
+                           per_host_concurrency=concurrency, follow_links=True,
+                           sink=lambda result: None)
+    start = time.perf_counter()
+    asyncio.run(crawler.run([f"{base_url}/page/1"]))
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    print(f"Crawled {crawler.pages_crawled} pages in {elapsed:.1f}s "
+          f"({crawler.pages_crawled / elapsed:.0f} pages/s, limit {per_host_rate}/s)")
+
+# benchmark_crawler()
+
+# Test site with big pages (lots of items) so parsing dominates
+class HeavySiteHandler(LocalSiteHandler):
+    def page_html(self, n):
+        items = ''.join(f"<div class='item'><h2>Item {n}-{i}</h2><p>Some text {i}</p></div>"
+                        for i in range(500))
+        return f"<html><head><title>Page {n}</title></head><body>{items}</body></html>"
+
+# Benchmark: pages per second, parsing in-thread vs in a process pool
+def benchmark_parse_pool(num_pages=200, workers=None):
+    workers = workers or os.cpu_count()
+    LocalSiteHandler.num_pages = num_pages
+    server, base_url = start_local_site(HeavySiteHandler)
+    paths = [f"/page/{n}" for n in range(1, num_pages + 1)]
+    
+    for label, parse_workers in [("In-thread", 0), (f"{workers} worker processes", workers)]:
+        scraper = WebScraper(base_url, parse_workers=parse_workers)
+        start = time.perf_counter()
+        scraper.scrape_many(paths, 'div.item h2')
+        elapsed = time.perf_counter() - start
+        scraper.close()
+        print(f"{label}: {num_pages / elapsed:.1f} pages/s")
+    
+    server.shutdown()
+
+# if __name__ == "__main__":
+#     benchmark_parse_pool()
+
+# Benchmark: parse time and memory for one big page
+def benchmark_parsers(num_items=5000, selector='div.item h2'):
+    import tracemalloc
+    
+    # Real pages are mostly menus, sidebars and ads around the data we want
+    noise = "<ul class='menu'>" + "<li><a href='/x'>Link</a></li>" * 10 + "</ul>"
+    items = ''.join(f"<div class='item featured'><h2>Item {i}</h2></div>"
+                    f"<div class='sidebar'>{noise}<p>Some <b>text</b> {i}</p></div>"
+                    for i in range(num_items))
+    html = f"<html><head><title>Big</title></head><body>{items}</body></html>"
+    
+    setups = [("html.parser", 'html.parser', None)]
+    if HTML_PARSER == 'lxml':
+        setups.append(("lxml", 'lxml', None))
+    setups.append((f"{HTML_PARSER} + strainer", HTML_PARSER, strainer_for(selector)))
+    
+    for label, parser, strainer in setups:
+        tracemalloc.start()
+        start = time.perf_counter()
+        soup = BeautifulSoup(html, parser, parse_only=strainer)
+        found = select(soup, selector)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{label}: {elapsed:.2f}s, peak {peak / 1e6:.0f} MB, {len(found)} matches")
+        del soup, found
+
+# benchmark_parsers()
+
+# Benchmark: robots.txt checks per URL, trie vs urllib.robotparser
+def benchmark_robots(num_urls=1_000_000, num_rules=200):
+    from urllib.robotparser import RobotFileParser
+    
+    lines = ["User-agent: *", "Crawl-delay: 2"]
+    for i in range(num_rules):
+        lines.append(f"Disallow: /private{i}/")
+        lines.append(f"Allow: /private{i}/public/")
+    lines.append("Disallow: /*.pdf$")
+    text = '\n'.join(lines)
+    
+    robots = RobotsCache(user_agent='PythonBasicsCrawler')
+    robots.store("http://example.com", 200, text)
+    sections = ['private', 'blog', 'shop', 'private']
+    urls = [f"http://example.com/{sections[i % 4]}{i % num_rules}/page{i}" for i in range(num_urls)]
+    
+    start = time.perf_counter()
+    allowed = sum(robots.can_fetch(url) for url in urls)
+    elapsed = time.perf_counter() - start
+    print(f"RobotsCache: {elapsed / num_urls * 1e6:.2f} us per URL ({allowed} of {num_urls} allowed)")
+    
+    parser = RobotFileParser()
+    parser.parse(text.splitlines())
+    sample = urls[:10000]
+    start = time.perf_counter()
+    sum(parser.can_fetch('PythonBasicsCrawler', url) for url in sample)
+    elapsed = time.perf_counter() - start
+    print(f"urllib.robotparser: {elapsed / len(sample) * 1e6:.2f} us per URL")
+
+# benchmark_robots()
+
+# Local site with ETags: answers 304 when the page hasn't changed.
+# Bump versions[n] to "edit" page n.
+class ConditionalSiteHandler(LocalSiteHandler):
+    versions = {}
+    
+    def page_html(self, n):
+        version = self.versions.get(n, 0)
+        items = ''.join(f"<div class='item'>Item {n}.{k}</div>" for k in range(20))
+        return (f"<html><head><title>Page {n}</title></head><body>{items}"
+                f"<div class='item'>Item {n} version {version}</div></body></html>")
+    
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if not (path.startswith('/page/') and path[6:].isdigit()):
+            return super().do_GET()
+        n = int(path[6:])
+        etag = f'"{n}-{self.versions.get(n, 0)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = self.page_html(n).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+# Benchmark: full crawl, then a re-crawl after a few pages changed
+def benchmark_recrawl(num_pages=1000, changed_fraction=0.02, state_file='recrawl_state.db'):
+    import os
+    import random
+    
+    if os.path.exists(state_file):
+        os.remove(state_file)
+    server, base_url = start_local_site(ConditionalSiteHandler)
+    scraper = WebScraper(base_url, state=CrawlState(state_file))
+    paths = [f"/page/{n}" for n in range(1, num_pages + 1)]
+    
+    for label in ("first crawl", "re-crawl"):
+        if label == "re-crawl":
+            for n in random.sample(range(1, num_pages + 1), int(num_pages * changed_fraction)):
+                ConditionalSiteHandler.versions[n] = ConditionalSiteHandler.versions.get(n, 0) + 1
+        start = time.perf_counter()
+        changes = scraper.scrape_changed(paths, 'div.item')
+        elapsed = time.perf_counter() - start
+        new_items = sum(len(items) for items in changes.values())
+        print(f"{label}: {elapsed:.2f}s, {scraper.recrawl_stats}, {new_items} new items")
+    
+    scraper.state.close()
+    scraper.close()
+    server.shutdown()
+    os.remove(state_file)
+
+# benchmark_recrawl()
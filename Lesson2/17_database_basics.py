@@ -14,9 +14,313 @@ def create_connection(db_name="mydatabase.db"):
         print(f"Error: {e}")
         return None
 
+# Query profiler - find out which SQL is slow.
+# Opt in with one argument, e.g. Database("app.db", profiler=QueryProfiler()).
+# Without a profiler, plain sqlite3 connections are used (no overhead).
+import json
+import threading
+import time
+
+class QueryProfiler:
+    # Upper bounds of the latency histogram buckets, in milliseconds
+    BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, float('inf')]
+    
+    def __init__(self, slow_threshold=0.1, max_slow_queries=100):
+        self.slow_threshold = slow_threshold  # Seconds
+        self.max_slow_queries = max_slow_queries
+        self.stats = {}          # sql -> counters and histogram
+        self.slow_queries = []   # Details for statements over the threshold
+        self._lock = threading.Lock()
+    
+    def _stat_for(self, sql):
+        sql = ' '.join(sql.split())  # Same query, different whitespace -> same entry
+        stat = self.stats.get(sql)
+        if stat is None:
+            stat = self.stats[sql] = {
+                'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'rows': 0,
+                'histogram': [0] * len(self.BUCKETS_MS),
+            }
+        return stat
+    
+    def record(self, conn, sql, params, seconds, rows):
+        with self._lock:
+            stat = self._stat_for(sql)
+            stat['count'] += 1
+            stat['total_time'] += seconds
+            stat['max_time'] = max(stat['max_time'], seconds)
+            stat['rows'] += max(rows, 0)
+            ms = seconds * 1000
+            for i, bound in enumerate(self.BUCKETS_MS):
+                if ms <= bound:
+                    stat['histogram'][i] += 1
+                    break
+        
+        if seconds >= self.slow_threshold and params is not None:
+            self._log_slow_query(conn, sql, params, seconds)
+        return stat
+    
+    def _log_slow_query(self, conn, sql, params, seconds):
+        plan = []
+        try:
+            # A plain cursor, so the EXPLAIN itself is not profiled
+            cursor = sqlite3.Connection.cursor(conn)
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error:
+            pass
+        
+        # "SCAN users" = reads the whole table; "SCAN users USING INDEX ..." is fine
+        full_scans = [step for step in plan if step.startswith("SCAN") and "USING" not in step]
+        with self._lock:
+            if len(self.slow_queries) < self.max_slow_queries:
+                self.slow_queries.append({
+                    'sql': ' '.join(sql.split()),
+                    'seconds': seconds,
+                    'plan': plan,
+                    'full_table_scan': bool(full_scans),
+                })
+    
+    def to_json(self, filename=None):
+        with self._lock:
+            data = {
+                'histogram_buckets_ms': [str(b) for b in self.BUCKETS_MS],
+                'statements': self.stats,
+                'slow_queries': self.slow_queries,
+            }
+            text = json.dumps(data, indent=2)
+        if filename:
+            with open(filename, 'w') as file:
+                file.write(text)
+        return text
+    
+    def report(self, top=10):
+        print("\n--- Slowest statements (total time) ---")
+        ranked = sorted(self.stats.items(), key=lambda item: item[1]['total_time'], reverse=True)
+        for sql, stat in ranked[:top]:
+            avg_ms = stat['total_time'] / stat['count'] * 1000
+            print(f"{stat['count']}x avg {avg_ms:.2f} ms, rows {stat['rows']}: {sql[:70]}")
+        for slow in self.slow_queries:
+            if slow['full_table_scan']:
+                print(f"Full table scan ({slow['seconds'] * 1000:.0f} ms): {slow['sql'][:70]}")
+
+class ProfiledCursor(sqlite3.Cursor):
+    # execute() only runs the first step of a SELECT - most of the work
+    # happens while rows are fetched. So a statement is timed across its
+    # fetches and recorded once it's done: all rows read, the cursor
+    # reused for another statement, closed or garbage collected.
+    _pending = None  # [sql, params, seconds, rows]
+    
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending:
+            self.connection.profiler.record(self.connection, *pending)
+    
+    def _fetched(self, start, rows, done):
+        if self._pending:
+            self._pending[2] += time.perf_counter() - start
+            self._pending[3] += rows
+            if done:
+                self._finish()
+    
+    def execute(self, sql, params=()):
+        self._finish()
+        start = time.perf_counter()
+        result = super().execute(sql, params)
+        self._pending = [sql, params, time.perf_counter() - start, max(self.rowcount, 0)]
+        if self.description is None:  # Not a query - no rows to fetch
+            self._finish()
+        return result
+    
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        start = time.perf_counter()
+        result = super().executemany(sql, seq_of_params)
+        self.connection.profiler.record(
+            self.connection, sql, None, time.perf_counter() - start, self.rowcount)
+        return result
+    
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None, row is None)
+        return row
+    
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), len(rows) < size)
+        return rows
+    
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), True)
+        return rows
+    
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, True)
+            raise
+        self._fetched(start, 1, False)
+        return row
+    
+    def close(self):
+        self._finish()
+        super().close()
+    
+    def __del__(self):
+        self._finish()
+
+class ProfiledConnection(sqlite3.Connection):
+    profiler = None
+    
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+    
+    # conn.execute() shortcuts don't go through cursor(), so route them here
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+    
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+def connect_profiled(db_name, profiler=None, **kwargs):
+    if profiler is None:
+        return sqlite3.connect(db_name, **kwargs)
+    conn = sqlite3.connect(db_name, factory=ProfiledConnection, **kwargs)
+    conn.profiler = profiler
+    return conn
+
+# Connection pool - reuse open connections instead of opening the file
+# for every query. Safe to share between threads.
+import queue
+from contextlib import contextmanager
+
+class ConnectionPool:
+    def __init__(self, db_name="mydatabase.db", size=5, timeout=5.0, profiler=None):
+        self.db_name = db_name
+        self.size = size
+        self.timeout = timeout  # Seconds to wait for a free connection
+        self.profiler = profiler  # Optional QueryProfiler for every connection
+        self._idle = queue.Queue(maxsize=size)
+        self._created = 0
+        self._in_use = set()    # Connections currently handed out
+        self._retired = set()   # Handed out before close_all(); closed when returned
+        self._lock = threading.Lock()
+    
+    def _new_connection(self):
+        # check_same_thread=False: a connection may be used by different
+        # threads, but the pool only ever hands it to one at a time
+        return connect_profiled(self.db_name, self.profiler, check_same_thread=False)
+    
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def get(self):
+        conn = self._checkout()
+        with self._lock:
+            self._in_use.add(conn)
+        return conn
+    
+    def _checkout(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            # Open a new connection if we are still below the pool size
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    return self._new_connection()
+            try:
+                conn = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise TimeoutError(f"No free connection after {self.timeout}s")
+        
+        # Health check - replace broken connections
+        if not self._is_healthy(conn):
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            conn = self._new_connection()
+        return conn
+    
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+    
+    def put(self, conn):
+        with self._lock:
+            self._in_use.discard(conn)
+            retired = conn in self._retired
+            self._retired.discard(conn)
+        if retired:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            return
+        
+        # Never hand out a connection with a half-finished transaction.
+        # A closed or broken connection is dropped; get() opens a new one.
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        conn.row_factory = None
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            self._discard(conn)  # More connections than the pool size - never block
+    
+    @contextmanager
+    def connection(self):
+        conn = self.get()
+        try:
+            yield conn
+        finally:
+            self.put(conn)
+    
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            # Connections still handed out are closed when they come back
+            self._retired |= self._in_use
+            self._in_use.clear()
+            self._created = 0
+
+# One shared pool per database file
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_name="mydatabase.db", size=5, timeout=5.0):
+    with _pools_lock:
+        if db_name not in _pools:
+            _pools[db_name] = ConnectionPool(db_name, size, timeout)
+        return _pools[db_name]
+
 # Create a table
 def create_table():
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     # SQL command to create table
@@ -36,11 +340,12 @@ def create_table():
     except sqlite3.Error as e:
         print(f"Error: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Insert data
 def insert_user(name, email, age):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     insert_sql = "INSERT INTO users (name, email, age) VALUES (?, ?, ?)"
@@ -54,11 +359,12 @@ def insert_user(name, email, age):
     except sqlite3.Error as e:
         print(f"Error: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Insert multiple users
 def insert_multiple_users(users):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     insert_sql = "INSERT INTO users (name, email, age) VALUES (?, ?, ?)"
@@ -70,11 +376,12 @@ def insert_multiple_users(users):
     except sqlite3.Error as e:
         print(f"Error: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Query all data
 def get_all_users():
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     try:
@@ -90,11 +397,12 @@ def get_all_users():
         print(f"Error: {e}")
         return []
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Query with condition
 def get_user_by_id(user_id):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     try:
@@ -111,11 +419,12 @@ def get_user_by_id(user_id):
         print(f"Error: {e}")
         return None
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Update data
 def update_user(user_id, name=None, email=None, age=None):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     updates = []
@@ -133,7 +442,7 @@ def update_user(user_id, name=None, email=None, age=None):
     
     if not updates:
         print("No updates provided")
-        conn.close()
+        pool.put(conn)
         return
     
     params.append(user_id)
@@ -146,11 +455,12 @@ def update_user(user_id, name=None, email=None, age=None):
     except sqlite3.Error as e:
         print(f"Error: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Delete data
 def delete_user(user_id):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     try:
@@ -164,11 +474,12 @@ def delete_user(user_id):
     except sqlite3.Error as e:
         print(f"Error: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Search users
 def search_users(keyword):
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     try:
@@ -185,11 +496,12 @@ def search_users(keyword):
         print(f"Error: {e}")
         return []
     finally:
-        conn.close()
+        pool.put(conn)
 
 # Working with transactions
 def transfer_with_transaction():
-    conn = create_connection()
+    pool = get_pool()
+    conn = pool.get()
     cursor = conn.cursor()
     
     try:
@@ -208,30 +520,149 @@ def transfer_with_transaction():
         conn.rollback()
         print(f"Transaction failed: {e}")
     finally:
-        conn.close()
+        pool.put(conn)
+
+# Query result cache - repeated SELECTs are answered from memory.
+# Entries are dropped when a write through Database.execute touches one
+# of the tables the query reads from.
+import sys
+from collections import OrderedDict
+
+WRITE_ACTIONS = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+
+@contextmanager
+def tables_touched(conn):
+    # SQLite tells the authorizer about every table a statement reads or
+    # writes (joins, subqueries, views, triggers, "main.table" names),
+    # which is more reliable than parsing the SQL ourselves
+    reads, writes = set(), set()
+    
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ:
+            reads.add(arg1.lower())
+        elif action in WRITE_ACTIONS:
+            writes.add(arg1.lower())
+        return sqlite3.SQLITE_OK
+    
+    conn.set_authorizer(authorizer)
+    try:
+        yield reads, writes
+    finally:
+        conn.set_authorizer(None)
+
+class QueryCache:
+    def __init__(self, max_entries=256, max_bytes=16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (rows, tables, size), oldest first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(sql, params):
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        return (sql, tuple(params))
+    
+    @staticmethod
+    def _size_of(rows):
+        # Rough estimate - good enough to keep the cache within its budget
+        return sys.getsizeof(rows) + sum(
+            sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+            for row in rows
+        )
+    
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)  # Mark as recently used
+            self.hits += 1
+            return list(self.entries[key][0])
+        self.misses += 1
+        return None
+    
+    def put(self, key, rows, tables):
+        # tables: every table the query read (see tables_touched)
+        size = self._size_of(rows)
+        if size > self.max_bytes or not tables:
+            return  # Too big to be worth caching, or we can't tell what it depends on
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (list(rows), set(tables), size)
+        self.total_bytes += size
+        
+        # Evict least recently used entries until we fit again
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+    
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.total_bytes -= size
+    
+    def invalidate(self, written):
+        # written: tables a statement wrote to (see tables_touched)
+        if 'sqlite_master' in written:
+            self.clear()  # CREATE/DROP/ALTER - play it safe
+            return
+        for key in [k for k, (_, tables, _) in self.entries.items() if tables & written]:
+            self._remove(key)
+    
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+        }
 
 # Database class for better organization
 class Database:
-    def __init__(self, db_name="app.db"):
+    def __init__(self, db_name="app.db", pool=None, arraysize=1000, cache=None,
+                 profiler=None):
         self.db_name = db_name
+        self.pool = pool  # Optional ConnectionPool to borrow from
+        self.arraysize = arraysize  # Rows fetched per round trip in iter_query
+        self.cache = cache  # Optional QueryCache for fetchall results
+        self.profiler = profiler  # Optional QueryProfiler (ignored with a pool)
         self.conn = None
     
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            if self.pool:
+                self.conn = self.pool.get()
+            else:
+                self.conn = connect_profiled(self.db_name, self.profiler)
             self.conn.row_factory = sqlite3.Row  # Access columns by name
             return self.conn
-        except sqlite3.Error as e:
+        except (sqlite3.Error, TimeoutError) as e:
             print(f"Connection error: {e}")
             return None
     
     def close(self):
         if self.conn:
-            self.conn.close()
+            if self.pool:
+                self.pool.put(self.conn)  # Give it back instead of closing
+            else:
+                self.conn.close()
+            self.conn = None
     
     def execute(self, sql, params=()):
         cursor = self.conn.cursor()
         try:
+            if self.cache:
+                with tables_touched(self.conn) as (_, written):
+                    cursor.execute(sql, params)
+                self.conn.commit()
+                if written or not sql.lstrip().upper().startswith(("SELECT", "WITH", "EXPLAIN")):
+                    # A write we couldn't attribute to a table (VACUUM etc.) clears everything
+                    self.cache.invalidate(written or {'sqlite_master'})
+                return cursor
             cursor.execute(sql, params)
             self.conn.commit()
             return cursor
@@ -240,18 +671,208 @@ class Database:
             return None
     
     def fetchall(self, sql, params=()):
+        if self.cache:
+            key = self.cache.make_key(sql, params)
+            rows = self.cache.get(key)
+            if rows is not None:
+                return rows
+        
         cursor = self.conn.cursor()
         try:
-            cursor.execute(sql, params)
-            return cursor.fetchall()
+            if not self.cache:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            with tables_touched(self.conn) as (read, _):
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            self.cache.put(key, rows, read)
+            return rows
         except sqlite3.Error as e:
             print(f"Error: {e}")
             return []
+    
+    # Stream rows in chunks instead of loading the whole result.
+    # row_type can be a namedtuple or dataclass: each row becomes row_type(*row)
+    def iter_query(self, sql, params=(), chunk=None, row_type=None):
+        cursor = self.conn.cursor()
+        cursor.arraysize = chunk or self.arraysize
+        try:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield row_type(*row) if row_type else row
+        except sqlite3.Error as e:
+            print(f"Error: {e}")
+        finally:
+            cursor.close()
+
+# Caching repeated queries - just pass a QueryCache
+# db = Database("app.db", cache=QueryCache(max_entries=500))
+# db.connect()
+# db.fetchall("SELECT COUNT(*) FROM users")   # miss - runs the query
+# db.fetchall("SELECT COUNT(*) FROM users")   # hit - from memory
+# db.execute("INSERT INTO users (name, email, age) VALUES (?, ?, ?)", ("Ann", "ann@example.com", 30))
+# db.fetchall("SELECT COUNT(*) FROM users")   # miss again - users changed
+# print(db.cache.stats())
+
+# Streaming a big table - memory stays flat no matter how many rows
+# from collections import namedtuple
+# User = namedtuple("User", ["id", "name", "email", "age"])
+# db = Database("app.db")
+# db.connect()
+# for user in db.iter_query("SELECT * FROM users", chunk=5000, row_type=User):
+#     print(user.name)
+# db.close()
+
+# Sharding - spread one table over several SQLite files.
+# Each file has its own writer, so inserts into different shards can run
+# at the same time in separate processes. Rows are placed by hashing a
+# key column, so keys must come from you (e.g. email or a uuid) - an
+# AUTOINCREMENT id would repeat across shards.
+import heapq
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from itertools import islice
+
+# These run inside worker processes, so they open their own connections
+def _shard_query(db_name, sql, params):
+    conn = sqlite3.connect(db_name)
+    rows = conn.execute(sql, params).fetchall()
+    conn.close()
+    return rows
+
+def _shard_insert(db_name, sql, rows):
+    conn = sqlite3.connect(db_name, timeout=30)
+    with conn:
+        conn.executemany(sql, rows)
+    conn.close()
+    return len(rows)
+
+class ShardedDatabase:
+    def __init__(self, base_name="users", num_shards=4, key_column="id", workers=None):
+        self.key_column = key_column
+        self.shard_names = [f"{base_name}_shard{i}.db" for i in range(num_shards)]
+        self.shards = [Database(name) for name in self.shard_names]
+        for db in self.shards:
+            db.connect()
+        self.workers = workers or num_shards
+        self._executor = None
+    
+    @property
+    def executor(self):
+        # Start worker processes only when a scan or bulk insert needs them
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+    
+    def shard_for(self, key):
+        # crc32 is stable between runs, unlike hash() for strings
+        return zlib.crc32(str(key).encode()) % len(self.shards)
+    
+    def execute_all(self, sql, params=()):
+        # For statements every shard needs, like CREATE TABLE
+        for db in self.shards:
+            db.execute(sql, params)
+    
+    def insert(self, table, row):
+        columns = ', '.join(row)
+        placeholders = ', '.join('?' for _ in row)
+        db = self.shards[self.shard_for(row[self.key_column])]
+        return db.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                          tuple(row.values()))
+    
+    def insert_many(self, table, rows):
+        # rows: list of dicts with the same keys. Each shard is written by
+        # its own process, so throughput grows with the number of shards.
+        rows = list(rows)
+        if not rows:
+            return 0
+        columns = list(rows[0])
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        
+        batches = [[] for _ in self.shards]
+        for row in rows:
+            batches[self.shard_for(row[self.key_column])].append(tuple(row[c] for c in columns))
+        
+        jobs = [(name, batch) for name, batch in zip(self.shard_names, batches) if batch]
+        counts = self.executor.map(_shard_insert,
+                                   [name for name, _ in jobs],
+                                   [sql] * len(jobs),
+                                   [batch for _, batch in jobs])
+        return sum(counts)
+    
+    def get(self, table, key):
+        db = self.shards[self.shard_for(key)]
+        rows = db.fetchall(f"SELECT * FROM {table} WHERE {self.key_column} = ?", (key,))
+        return rows[0] if rows else None
+    
+    def update(self, table, key, **changes):
+        db = self.shards[self.shard_for(key)]
+        assignments = ', '.join(f"{column} = ?" for column in changes)
+        return db.execute(f"UPDATE {table} SET {assignments} WHERE {self.key_column} = ?",
+                          tuple(changes.values()) + (key,))
+    
+    def delete(self, table, key):
+        db = self.shards[self.shard_for(key)]
+        return db.execute(f"DELETE FROM {table} WHERE {self.key_column} = ?", (key,))
+    
+    def scan(self, sql, params=(), order_by=None, reverse=False, limit=None):
+        # Runs sql on every shard in parallel and combines the results.
+        # For sorted output, sql must have an ORDER BY and order_by is the
+        # index of that column in each row; the sorted shard results are merged.
+        # A LIMIT in sql applies to each shard, so up to num_shards * LIMIT
+        # rows come back - pass limit to cap the combined result.
+        n = len(self.shards)
+        results = list(self.executor.map(_shard_query, self.shard_names,
+                                         [sql] * n, [params] * n))
+        if order_by is None:
+            rows = (row for rows in results for row in rows)
+        else:
+            rows = heapq.merge(*results, key=itemgetter(order_by), reverse=reverse)
+        return list(islice(rows, limit))
+    
+    def close(self):
+        for db in self.shards:
+            db.close()
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+
+# sharded = ShardedDatabase("users", num_shards=4, key_column="email")
+# sharded.execute_all("CREATE TABLE IF NOT EXISTS users (email TEXT PRIMARY KEY, name TEXT, age INTEGER)")
+# sharded.insert("users", {"email": "peter@example.com", "name": "Peter", "age": 25})
+# print(sharded.get("users", "peter@example.com"))
+# oldest = sharded.scan("SELECT * FROM users ORDER BY age DESC LIMIT 10", order_by=2,
+#                       reverse=True, limit=10)
+# sharded.close()
+
+# Benchmark: insert throughput with 1, 2, 4 and 8 shards
+def benchmark_sharded_inserts(num_rows=400_000, shard_counts=(1, 2, 4, 8)):
+    rows = [{"email": f"user{i}@example.com", "name": f"User {i}", "age": i % 80}
+            for i in range(num_rows)]
+    
+    for num_shards in shard_counts:
+        sharded = ShardedDatabase(f"bench{num_shards}", num_shards, key_column="email")
+        sharded.execute_all("CREATE TABLE IF NOT EXISTS users (email TEXT PRIMARY KEY, name TEXT, age INTEGER)")
+        sharded.execute_all("DELETE FROM users")
+        
+        start = time.perf_counter()
+        sharded.insert_many("users", rows)
+        elapsed = time.perf_counter() - start
+        print(f"{num_shards} shard(s): {num_rows / elapsed:,.0f} rows/s")
+        sharded.close()
+
+# if __name__ == "__main__":
+#     benchmark_sharded_inserts()
 
 # Practical example: Student management system
 class StudentDatabase:
-    def __init__(self):
-        self.conn = sqlite3.connect("students.db")
+    def __init__(self, profiler=None):
+        self.conn = connect_profiled("students.db", profiler)
         self.create_tables()
     
     def create_tables(self):
@@ -278,6 +899,10 @@ class StudentDatabase:
         )
         """)
         
+        # Indexes for the join in get_student_courses and the sort in get_top_students
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_courses_student_id ON courses(student_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_students_gpa ON students(gpa)")
+        
         self.conn.commit()
     
     def add_student(self, name, grade, gpa):
@@ -293,6 +918,24 @@ class StudentDatabase:
                       (student_id, course_name, score))
         self.conn.commit()
     
+    # Bulk versions: one transaction for all rows instead of a commit per row
+    def add_students(self, students):
+        # students: list of (name, grade, gpa); returns the new ids in order
+        cursor = self.conn.cursor()
+        ids = []
+        with self.conn:
+            for row in students:
+                cursor.execute("INSERT INTO students (name, grade, gpa) VALUES (?, ?, ?)", row)
+                ids.append(cursor.lastrowid)
+        return ids
+    
+    def add_courses(self, courses):
+        # courses: list of (student_id, course_name, score)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO courses (student_id, course_name, score) VALUES (?, ?, ?)",
+                courses)
+    
     def get_student_courses(self, student_id):
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -303,6 +946,25 @@ class StudentDatabase:
         """, (student_id,))
         return cursor.fetchall()
     
+    # Courses for many students in one query (avoids one query per student)
+    def get_courses_for(self, student_ids):
+        student_ids = list(student_ids)
+        courses = {student_id: [] for student_id in student_ids}
+        cursor = self.conn.cursor()
+        
+        # SQLite limits the number of ? placeholders, so go in batches
+        batch_size = 500
+        for i in range(0, len(student_ids), batch_size):
+            batch = student_ids[i:i + batch_size]
+            placeholders = ', '.join('?' for _ in batch)
+            cursor.execute(f"""
+            SELECT student_id, course_name, score FROM courses
+            WHERE student_id IN ({placeholders})
+            """, batch)
+            for student_id, course_name, score in cursor.fetchall():
+                courses[student_id].append((course_name, score))
+        return courses
+    
     def get_top_students(self, limit=5):
         cursor = self.conn.cursor()
         cursor.execute("SELECT * FROM students ORDER BY gpa DESC LIMIT ?", (limit,))
@@ -318,61 +980,296 @@ class StudentDatabase:
 # db.add_course(student_id, "Science", 88)
 # courses = db.get_student_courses(student_id)
 # print(courses)
+# Profiling: StudentDatabase(profiler=QueryProfiler(slow_threshold=0.05))
+# then db.conn.profiler.report() or db.conn.profiler.to_json("stats.json")
+# ids = db.add_students([("Jane Smith", "10th", 3.9), ("John Doe", "11th", 3.2)])
+# db.add_courses([(ids[0], "Math", 98), (ids[1], "Math", 81)])
+# print(db.get_courses_for(ids))
 # db.close()
 
 # Backup database
-def backup_database(source_db, backup_db):
+# pages=-1 copies everything in one step (locks the source the whole time).
+# A positive value copies that many pages per step and sleeps in between,
+# so writers can get in. Note: if another connection writes during the
+# backup, SQLite restarts the copy - keep steps small but not tiny.
+# skip_unchanged=True skips the copy when the source file has not changed
+# since the last backup (tracked in a small "<backup>.state" file).
+def print_backup_progress(status, remaining, total):
+    done = total - remaining
+    print(f"Backup progress: {done}/{total} pages ({done / max(total, 1):.0%})")
+
+def _file_state(db_name):
+    import json
+    
+    state = []
+    for path in (db_name, db_name + "-wal"):
+        if os.path.exists(path):
+            info = os.stat(path)
+            state.append([path, info.st_mtime_ns, info.st_size])
+    return json.dumps(state)
+
+def backup_database(source_db, backup_db, pages=-1, sleep=0.25, progress=None,
+                    skip_unchanged=False):
+    state_file = backup_db + ".state"
+    source_state = _file_state(source_db)
+    
+    if skip_unchanged and os.path.exists(backup_db) and os.path.exists(state_file):
+        with open(state_file, 'r') as file:
+            if file.read() == source_state:
+                print(f"Source unchanged, backup skipped: {backup_db}")
+                return False
+    
     try:
         source = sqlite3.connect(source_db)
         backup = sqlite3.connect(backup_db)
-        source.backup(backup)
+        source.backup(backup, pages=pages, progress=progress, sleep=sleep)
         backup.close()
         source.close()
+        
+        with open(state_file, 'w') as file:
+            file.write(source_state)
         print(f"Backup created: {backup_db}")
+        return True
     except sqlite3.Error as e:
         print(f"Backup failed: {e}")
+        return False
+
+# backup_database("app.db", "app_backup.db", pages=100, sleep=0.01,
+#                 progress=print_backup_progress, skip_unchanged=True)
+
+# Benchmark: how long do writers wait while a backup is running?
+# The writer does a fixed number of writes (each write restarts a stepped
+# backup, so the backup finishes once the writes stop).
+def benchmark_backup_writer_latency(source_db, backup_db, pages=-1, sleep=0.01,
+                                    writes=200, interval=0.005):
+    conn = sqlite3.connect(source_db, timeout=60)
+    conn.execute("CREATE TABLE IF NOT EXISTS backup_probe (id INTEGER PRIMARY KEY, ts REAL)")
+    conn.commit()
+    
+    worker = threading.Thread(target=backup_database,
+                              args=(source_db, backup_db, pages, sleep))
+    worker.start()
+    
+    latencies = []
+    for _ in range(writes):
+        start = time.perf_counter()
+        conn.execute("INSERT INTO backup_probe (ts) VALUES (?)", (time.time(),))
+        conn.commit()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    worker.join()
+    conn.close()
+    
+    if latencies:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"pages={pages}: {len(latencies)} writes, "
+              f"p99 {p99 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+
+# benchmark_backup_writer_latency("big.db", "big_backup.db", pages=-1)
+# benchmark_backup_writer_latency("big.db", "big_backup.db", pages=1000)
 
 # Export to CSV
-def export_to_csv(db_name, table_name, csv_filename):
+# Streams rows with fetchmany, so memory stays flat for any table size.
+# Options: pick columns, filter with a WHERE clause (use ? placeholders
+# and pass params), compress with gzip or zstd, and split the table into
+# key ranges written in parallel to several part files.
+CSV_COMPRESSION = (None, "gzip", "zstd")
+
+def _open_csv_output(filename, compression=None):
+    import io
+    
+    if compression not in CSV_COMPRESSION:
+        raise ValueError(f"Unknown compression: {compression!r}")
+    if compression == "gzip":
+        import gzip
+        return gzip.open(filename, 'wt', newline='', encoding='utf-8')
+    if compression == "zstd":
+        import zstandard  # pip install zstandard
+        raw = zstandard.ZstdCompressor().stream_writer(open(filename, 'wb'))
+        return io.TextIOWrapper(raw, newline='', encoding='utf-8')
+    return open(filename, 'w', newline='', encoding='utf-8')
+
+def _export_rows(db_name, sql, params, column_names, filename, compression, chunk_size):
     import csv
     
     conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
+    cursor.arraysize = chunk_size
+    cursor.execute(sql, params)
     
-    cursor.execute(f"SELECT * FROM {table_name}")
-    rows = cursor.fetchall()
-    
-    # Get column names
-    column_names = [description[0] for description in cursor.description]
-    
-    with open(csv_filename, 'w', newline='', encoding='utf-8') as file:
+    count = 0
+    with _open_csv_output(filename, compression) as file:
         writer = csv.writer(file)
         writer.writerow(column_names)
-        writer.writerows(rows)
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            writer.writerows(rows)
+            count += len(rows)
     
     conn.close()
-    print(f"Exported to {csv_filename}")
+    return count
+
+def _part_filename(filename, index):
+    # out.csv -> out.part0.csv, data.2024.csv.gz -> data.2024.part0.csv.gz
+    folder, name = os.path.split(filename)
+    stem, ext = os.path.splitext(name)
+    if ext.lower() in ('.gz', '.zst', '.zstd'):
+        stem, inner_ext = os.path.splitext(stem)
+        ext = inner_ext + ext
+    return os.path.join(folder, f"{stem}.part{index}{ext}")
+
+def export_to_csv(db_name, table_name, csv_filename, columns=None, where=None,
+                  params=(), compression=None, chunk_size=10000, parts=1):
+    from concurrent.futures import ThreadPoolExecutor
+    
+    if compression not in CSV_COMPRESSION:
+        print(f"Unknown compression: {compression} (use 'gzip' or 'zstd')")
+        return 0
+    
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute(f'PRAGMA table_info("{table_name}")')
+    table_columns = [row[1] for row in cursor.fetchall()]
+    if not table_columns:
+        print(f"Table {table_name} not found")
+        conn.close()
+        return 0
+    
+    column_names = list(columns) if columns else table_columns
+    unknown = [name for name in column_names if name not in table_columns]
+    if unknown:
+        print(f"Unknown columns: {', '.join(unknown)}")
+        conn.close()
+        return 0
+    
+    quoted = ', '.join(f'"{name}"' for name in column_names)
+    select = f'SELECT {quoted} FROM "{table_name}"'
+    conditions = [f"({where})"] if where else []
+    where_sql = f" WHERE {conditions[0]}" if conditions else ""
+    
+    # Single file: one streaming pass
+    if parts <= 1:
+        conn.close()
+        sql = select + where_sql
+        count = _export_rows(db_name, sql, params, column_names,
+                             csv_filename, compression, chunk_size)
+        print(f"Exported {count} rows to {csv_filename}")
+        return count
+    
+    # Several part files: split the rowid range and export each slice in parallel
+    cursor.execute(f'SELECT MIN(rowid), MAX(rowid) FROM "{table_name}"{where_sql}', params)
+    low, high = cursor.fetchone()
+    conn.close()
+    if low is None:
+        low, high = 0, -1
+    
+    step = (high - low) // parts + 1
+    jobs = []
+    for i in range(parts):
+        start = low + i * step
+        part_where = " AND ".join(conditions + ["rowid BETWEEN ? AND ?"])
+        sql = f"{select} WHERE {part_where} ORDER BY rowid"
+        part_name = _part_filename(csv_filename, i)
+        jobs.append((sql, tuple(params) + (start, start + step - 1), part_name))
+    
+    with ThreadPoolExecutor(max_workers=parts) as executor:
+        futures = [
+            executor.submit(_export_rows, db_name, sql, part_params, column_names,
+                            part_name, compression, chunk_size)
+            for sql, part_params, part_name in jobs
+        ]
+        count = sum(future.result() for future in futures)
+    
+    print(f"Exported {count} rows to {parts} part files ({_part_filename(csv_filename, '*')})")
+    return count
 
 # Import from CSV
-def import_from_csv(db_name, table_name, csv_filename):
+# Fast bulk loader: the header is read once, one INSERT statement is
+# prepared, and rows go through executemany in chunks inside a single
+# transaction. Values are converted to each column's declared type.
+def _column_converter(declared_type):
+    declared_type = (declared_type or "").upper()
+    if "INT" in declared_type:
+        convert = int
+    elif "REAL" in declared_type or "FLOA" in declared_type or "DOUB" in declared_type:
+        convert = float
+    else:
+        return lambda value: value
+    return lambda value: convert(value) if value != "" else None
+
+def import_from_csv(db_name, table_name, csv_filename, chunk_size=10000, rebuild_indexes=False):
     import csv
+    from itertools import islice
     
     conn = sqlite3.connect(db_name)
     cursor = conn.cursor()
+    start = time.perf_counter()
     
-    with open(csv_filename, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
+    # Column names must exist in the table - never trust the CSV header
+    cursor.execute(f'PRAGMA table_info("{table_name}")')
+    table_columns = {row[1]: row[2] for row in cursor.fetchall()}
+    if not table_columns:
+        print(f"Table {table_name} not found")
+        conn.close()
+        return 0
+    
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        unknown = [name for name in header if name not in table_columns]
+        if unknown:
+            print(f"Unknown columns in {csv_filename}: {', '.join(unknown)}")
+            conn.close()
+            return 0
+        
+        converters = [_column_converter(table_columns[name]) for name in header]
+        columns = ', '.join(f'"{name}"' for name in header)
+        placeholders = ', '.join('?' for _ in header)
+        sql = f'INSERT INTO "{table_name}" ({columns}) VALUES ({placeholders})'
+        
+        # Optionally drop indexes during the load and rebuild them after -
+        # building an index once is cheaper than updating it per row
+        index_sql = []
+        if rebuild_indexes:
+            cursor.execute("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type='index' AND tbl_name=? AND sql IS NOT NULL
+            """, (table_name,))
+            index_sql = cursor.fetchall()
         
-        for row in reader:
-            columns = ', '.join(row.keys())
-            placeholders = ', '.join(['?' for _ in row])
-            sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+        count = 0
+        try:
+            cursor.execute("BEGIN")
+            for name, _ in index_sql:
+                cursor.execute(f'DROP INDEX "{name}"')
+            
+            while True:
+                chunk = [
+                    [convert(value) for convert, value in zip(converters, row)]
+                    for row in islice(reader, chunk_size)
+                ]
+                if not chunk:
+                    break
+                cursor.executemany(sql, chunk)
+                count += len(chunk)
             
-            cursor.execute(sql, list(row.values()))
+            for _, create_sql in index_sql:
+                cursor.execute(create_sql)
+            conn.commit()
+        except (sqlite3.Error, ValueError) as e:
+            conn.rollback()
+            print(f"Import failed: {e}")
+            conn.close()
+            return 0
     
-    conn.commit()
     conn.close()
-    print(f"Imported from {csv_filename}")
+    elapsed = time.perf_counter() - start
+    print(f"Imported {count} rows from {csv_filename} "
+          f"({count / max(elapsed, 1e-9):,.0f} rows/s)")
+    return count
 
 # Check if table exists
 def table_exists(db_name, table_name):
@@ -387,4 +1284,40 @@ def table_exists(db_name, table_name):
     exists = cursor.fetchone() is not None
     conn.close()
     
-    return exists
\ No newline at end of file
+    return exists
+
+# Benchmark: new connection per query vs connection pool
+def benchmark_connection_pool(db_name="benchmark.db", num_threads=8, queries_per_thread=500):
+    conn = sqlite3.connect(db_name)
+    conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO users (name) VALUES ('Peter')")
+    conn.commit()
+    conn.close()
+    
+    def without_pool():
+        for _ in range(queries_per_thread):
+            c = sqlite3.connect(db_name)
+            c.execute("SELECT * FROM users WHERE id = 1").fetchone()
+            c.close()
+    
+    pool = ConnectionPool(db_name, size=num_threads)
+    
+    def with_pool():
+        for _ in range(queries_per_thread):
+            with pool.connection() as c:
+                c.execute("SELECT * FROM users WHERE id = 1").fetchone()
+    
+    total_queries = num_threads * queries_per_thread
+    for label, worker in [("New connection", without_pool), ("Pooled", with_pool)]:
+        threads = [threading.Thread(target=worker) for _ in range(num_threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {elapsed / total_queries * 1e6:.0f} µs per query")
+    
+    pool.close_all()
+
+# benchmark_connection_pool()
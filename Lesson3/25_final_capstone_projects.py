@@ -4,9 +4,18 @@
 import sqlite3
 from datetime import datetime
 
+# Open a connection with settings that make writes much faster:
+# WAL lets readers and a writer work at the same time, and NORMAL
+# sync is still safe in WAL mode but avoids an fsync on every commit.
+def connect_database(db_name):
+    conn = sqlite3.connect(db_name)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
 class TodoApp:
     def __init__(self):
-        self.conn = sqlite3.connect('todo.db')
+        self.conn = connect_database('todo.db')
         self.create_table()
     
     def create_table(self):
@@ -437,6 +446,323 @@ class InventorySystem:
         print(f"Total Inventory Value: ${self.get_inventory_value():.2f}")
 
 
+# PROJECT 5a: Inventory saved in SQLite
+# Same interface as InventorySystem, but the catalog lives in a database.
+# Products are only loaded when first needed, and sync() writes back
+# just the rows that changed.
+class SQLiteInventorySystem(InventorySystem):
+    def __init__(self, db_name='inventory.db'):
+        self.conn = connect_database(db_name)
+        self.create_table()
+        self._products = None   # Loaded lazily on first access
+        self._saved = {}        # product_id -> quantity stored in the database
+        self.next_id = self._load_next_id()
+    
+    def create_table(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS products (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            price REAL NOT NULL,
+            quantity INTEGER NOT NULL
+        )
+        ''')
+        self.conn.commit()
+    
+    def _load_next_id(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT MAX(CAST(SUBSTR(id, 2) AS INTEGER)) FROM products
+        WHERE id GLOB 'P[0-9]*'
+        ''')
+        return (cursor.fetchone()[0] or 0) + 1
+    
+    @property
+    def products(self):
+        if self._products is None:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT id, name, price, quantity FROM products")
+            self._products = {}
+            for pid, name, price, quantity in cursor:
+                self._products[pid] = {'name': name, 'price': price, 'quantity': quantity}
+                self._saved[pid] = quantity
+        return self._products
+    
+    def bulk_upsert(self, rows):
+        # rows: (product_id, name, price, quantity) - one executemany call
+        rows = list(rows)
+        with self.conn:
+            self.conn.executemany('''
+            INSERT INTO products (id, name, price, quantity)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name,
+                price = excluded.price,
+                quantity = excluded.quantity
+            ''', rows)
+        
+        # Keep the loaded copy in step (nothing to do if not loaded yet)
+        if self._products is not None:
+            for pid, name, price, quantity in rows:
+                self._products[pid] = {'name': name, 'price': price, 'quantity': quantity}
+                self._saved[pid] = quantity
+        
+        self.next_id = max(self.next_id, self._load_next_id())
+        print(f"Upserted {len(rows)} products")
+        return len(rows)
+    
+    def sync(self):
+        # Nothing was loaded, so nothing can have changed
+        if self._products is None:
+            return 0
+        
+        new_rows = []
+        changed = []
+        for pid, product in self._products.items():
+            saved = self._saved.get(pid)
+            if saved is None:
+                new_rows.append((pid, product['name'], product['price'], product['quantity']))
+            elif saved != product['quantity']:
+                changed.append((product['quantity'], pid))
+        
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO products (id, name, price, quantity) VALUES (?, ?, ?, ?)",
+                new_rows)
+            self.conn.executemany(
+                "UPDATE products SET quantity=? WHERE id=?", changed)
+        
+        for pid, name, price, quantity in new_rows:
+            self._saved[pid] = quantity
+        for quantity, pid in changed:
+            self._saved[pid] = quantity
+        
+        return len(new_rows) + len(changed)
+    
+    def close(self):
+        self.sync()
+        self.conn.close()
+
+
+# PROJECT 5b: Compact Inventory for very large catalogs
+# A dict per product costs several hundred bytes. For millions of SKUs we
+# keep each column in its own typed array ("struct of arrays") instead.
+# Product ids are stored as plain numbers (42) and only turned into
+# "P0042" strings when they leave the class. Names are stored once in a
+# name table; each product keeps just the number of its name.
+# Note: Install numpy first: pip install numpy
+import sys
+import time
+import numpy as np
+
+class CompactInventorySystem:
+    def __init__(self, capacity=1024):
+        self.prices = np.zeros(capacity, dtype=np.float64)
+        self.quantities = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.name_codes = np.zeros(capacity, dtype=np.int32)
+        self.ids = np.zeros(capacity, dtype=np.int64)       # slot -> numeric id
+        self.slot_of = np.full(capacity, -1, dtype=np.int64)  # numeric id -> slot (-1: none)
+        self.names = []          # name code -> name
+        self.name_codes_by_name = {}
+        self.free_slots = []     # slots left behind by removed products
+        self.size = 0            # highest slot ever used
+        self.next_id = 1
+    
+    @staticmethod
+    def _grown(array, capacity, fill=0):
+        grown = np.full(capacity, fill, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+    
+    def _grow(self):
+        capacity = len(self.prices) * 2
+        self.prices = self._grown(self.prices, capacity)
+        self.quantities = self._grown(self.quantities, capacity)
+        self.active = self._grown(self.active, capacity)
+        self.name_codes = self._grown(self.name_codes, capacity)
+        self.ids = self._grown(self.ids, capacity)
+    
+    def _next_slot(self):
+        if self.free_slots:
+            return self.free_slots.pop()
+        if self.size == len(self.prices):
+            self._grow()
+        self.size += 1
+        return self.size - 1
+    
+    def _name_code(self, name):
+        code = self.name_codes_by_name.get(name)
+        if code is None:
+            code = self.name_codes_by_name[name] = len(self.names)
+            self.names.append(name)
+        return code
+    
+    @staticmethod
+    def _format_id(number):
+        return f"P{number:04d}"
+    
+    def _slot(self, product_id):
+        # "P0042" -> slot of product 42, or None
+        if not product_id.startswith("P") or not product_id[1:].isdigit():
+            return None
+        number = int(product_id[1:])
+        if number >= len(self.slot_of) or self.slot_of[number] < 0:
+            return None
+        return int(self.slot_of[number])
+    
+    def _store(self, name, price, quantity):
+        number = self.next_id
+        self.next_id += 1
+        if number >= len(self.slot_of):
+            self.slot_of = self._grown(self.slot_of, max(number + 1, len(self.slot_of) * 2), -1)
+        
+        slot = self._next_slot()
+        self.prices[slot] = price
+        self.quantities[slot] = quantity
+        self.active[slot] = True
+        self.name_codes[slot] = self._name_code(name)
+        self.ids[slot] = number
+        self.slot_of[number] = slot
+        return number
+    
+    def add_product(self, name, price, quantity):
+        product_id = self._format_id(self._store(name, price, quantity))
+        print(f"Product added: {name} (ID: {product_id})")
+        return product_id
+    
+    def add_products(self, rows):
+        # Bulk version: rows of (name, price, quantity), no printing per item
+        return [self._format_id(self._store(name, price, quantity))
+                for name, price, quantity in rows]
+    
+    def get_product(self, product_id):
+        slot = self._slot(product_id)
+        if slot is None:
+            return None
+        return {
+            'name': self.names[self.name_codes[slot]],
+            'price': float(self.prices[slot]),
+            'quantity': int(self.quantities[slot]),
+        }
+    
+    def remove_product(self, product_id):
+        slot = self._slot(product_id)
+        if slot is None:
+            print("Product not found")
+            return False
+        
+        # Zero the slot so totals stay correct without checking 'active'
+        self.slot_of[self.ids[slot]] = -1
+        self.prices[slot] = 0
+        self.quantities[slot] = 0
+        self.active[slot] = False
+        self.ids[slot] = 0
+        self.free_slots.append(slot)
+        return True
+    
+    def update_quantity(self, product_id, quantity_change):
+        slot = self._slot(product_id)
+        if slot is None:
+            print("Product not found")
+            return False
+        
+        new_quantity = self.quantities[slot] + quantity_change
+        if new_quantity < 0:
+            print("Insufficient stock")
+            return False
+        
+        self.quantities[slot] = new_quantity
+        print(f"Quantity updated. New stock: {new_quantity}")
+        return True
+    
+    def get_inventory_value(self):
+        # One vectorized dot product instead of a Python loop
+        n = self.size
+        return float(np.dot(self.prices[:n], self.quantities[:n]))
+    
+    def low_stock_slots(self, threshold=10):
+        n = self.size
+        mask = self.active[:n] & (self.quantities[:n] < threshold)
+        return np.flatnonzero(mask)
+    
+    def low_stock_report(self, threshold=10):
+        print("\nLow Stock Items:")
+        print("="*50)
+        
+        low_stock = self.low_stock_slots(threshold)
+        if len(low_stock) == 0:
+            print("All items have sufficient stock")
+            return
+        
+        for slot in low_stock:
+            print(f"{self._format_id(self.ids[slot])}: {self.names[self.name_codes[slot]]} "
+                  f"- Only {self.quantities[slot]} left")
+    
+    def inventory_report(self):
+        print("\nFull Inventory Report")
+        print("="*60)
+        
+        n = self.size
+        values = self.prices[:n] * self.quantities[:n]
+        for slot in np.flatnonzero(self.active[:n]):
+            print(f"{self._format_id(self.ids[slot])}: {self.names[self.name_codes[slot]]}")
+            print(f"  Price: ${self.prices[slot]:.2f} | Qty: {self.quantities[slot]} | Value: ${values[slot]:.2f}")
+        
+        print("="*60)
+        print(f"Total Inventory Value: ${values.sum():.2f}")
+    
+    def memory_usage(self):
+        # Everything the store holds: the arrays (at full capacity), the
+        # name table and the list of free slots
+        arrays = (self.prices, self.quantities, self.active, self.name_codes,
+                  self.ids, self.slot_of)
+        total = sum(array.nbytes for array in arrays)
+        total += sys.getsizeof(self.names) + sum(sys.getsizeof(name) for name in self.names)
+        total += sys.getsizeof(self.name_codes_by_name) + 28 * len(self.name_codes_by_name)
+        total += sys.getsizeof(self.free_slots) + 28 * len(self.free_slots)
+        return total
+
+# Benchmark: dict-per-product vs compact arrays
+def benchmark_inventory(num_skus=5_000_000):
+    import tracemalloc
+    
+    rows = [(f"Item {i % 1000}", 9.99, i % 50) for i in range(num_skus)]
+    
+    tracemalloc.start()
+    inv = InventorySystem()
+    for i, (name, price, quantity) in enumerate(rows, 1):
+        inv.products[f"P{i:04d}"] = {'name': name, 'price': price, 'quantity': quantity}
+    dict_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    start = time.time()
+    inv.get_inventory_value()
+    [pid for pid, p in inv.products.items() if p['quantity'] < 10]
+    dict_time = time.time() - start
+    del inv
+    
+    # add_products returns every id as a string - drop them before measuring
+    tracemalloc.start()
+    compact = CompactInventorySystem()
+    for start_row in range(0, num_skus, 100_000):
+        compact.add_products(rows[start_row:start_row + 100_000])
+    compact_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    start = time.time()
+    compact.get_inventory_value()
+    compact.low_stock_slots(10)
+    compact_time = time.time() - start
+    
+    print(f"SKUs: {num_skus:,}")
+    print(f"Dict store:    {dict_memory / 1e6:.0f} MB ({dict_memory / num_skus:.0f} B/SKU), "
+          f"report {dict_time:.3f}s")
+    print(f"Compact store: {compact_memory / 1e6:.0f} MB ({compact_memory / num_skus:.0f} B/SKU), "
+          f"report {compact_time:.3f}s, memory_usage() {compact.memory_usage() / num_skus:.0f} B/SKU")
+
+
 # USAGE EXAMPLES (commented out - uncomment to run)
 
 """
@@ -478,4 +804,18 @@ inv.add_product("Laptop", 999.99, 50)
 inv.add_product("Mouse", 29.99, 5)
 inv.low_stock_report()
 inv.inventory_report()
+
+# Inventory saved in SQLite
+db_inv = SQLiteInventorySystem()
+db_inv.bulk_upsert([("P0001", "Laptop", 999.99, 50), ("P0002", "Mouse", 29.99, 5)])
+db_inv.update_quantity("P0002", 10)
+print(f"Rows written: {db_inv.sync()}")
+db_inv.close()
+
+# Compact Inventory (millions of SKUs)
+big = CompactInventorySystem()
+big.add_products([("Laptop", 999.99, 50), ("Mouse", 29.99, 5)])
+print(big.get_inventory_value())
+big.low_stock_report()
+benchmark_inventory(5_000_000)
 """
\ No newline at end of file